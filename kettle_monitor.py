@@ -50,12 +50,20 @@ class KettleMonitor:
         # Lock for safe updates
         self._lock = threading.Lock()
 
+        # With an app token Slack pushes messages to us; polling is only the fallback
+        self.push_mode = False
+        if slack_fetch.SLACK_APP_TOKEN:
+            try:
+                self.socket_client = slack_fetch.start_socket_mode()
+                self.push_mode = True
+            except Exception as e:
+                print(f"MONITOR - Socket Mode unavailable, falling back to polling: {e}")
+
     def load_last_processed_ts(self):
         """Load the timestamp of the last processed message."""
         try:
-            if os.path.exists("json/last_processed_ts.txt"):
-                with open("json/last_processed_ts.txt", "r") as f:
-                    self.last_processed_ts = float(f.read().strip())
+            with open("json/last_processed_ts.txt", "r") as f:
+                self.last_processed_ts = float(f.read().strip())
         except (ValueError, FileNotFoundError):
             self.last_processed_ts = 0
 
@@ -177,15 +185,19 @@ class KettleMonitor:
         if now - self.last_slack_check < self.poll_interval:
             return
 
-        print(f"MONITOR - Polling Slack (last check: {time.strftime('%H:%M:%S', time.localtime(self.last_slack_check))})")
-
-        # Fetch new messages
-        try:
-            slack_fetch.main()
+        if self.push_mode:
+            # Socket Mode handler already appended new messages to messages.json
             self.last_slack_check = now
-        except Exception as e:
-            print(f"MONITOR - Slack fetch error: {e}")
-            return
+        else:
+            print(f"MONITOR - Polling Slack (last check: {time.strftime('%H:%M:%S', time.localtime(self.last_slack_check))})")
+
+            # Fetch new messages
+            try:
+                slack_fetch.main()
+                self.last_slack_check = now
+            except Exception as e:
+                print(f"MONITOR - Slack fetch error: {e}")
+                return
 
         # Inspect messages
         messages = self._read_messages()
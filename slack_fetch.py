@@ -1,12 +1,12 @@
 import os
 import json
 import time
-import requests
+import functools
+import bisect
+import threading
+import hashlib
+from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-import subprocess
-import sys
 
 # You can set these in your environment or in utils/keys.py
 try:
@@ -16,28 +16,82 @@ except Exception:
     SLACK_CHANNEL_ID = os.environ.get("SLACK_CHANNEL_ID")
     BOT_USER_ID = os.environ.get("BOT_USER_ID")
 
+# App-level token (xapp-...) enables Socket Mode push delivery instead of polling
+SLACK_APP_TOKEN = os.environ.get("SLACK_APP_TOKEN")
+
 assert SLACK_BOT_TOKEN, "SLACK_BOT_TOKEN must be set in environment or keys.py"
 assert SLACK_CHANNEL_ID, "SLACK_CHANNEL_ID must be set in environment or keys.py"
 
-client = WebClient(token=SLACK_BOT_TOKEN)
+# Created on first use so importing this module doesn't pull in slack_sdk
+client = None
+
+def get_client():
+    """Shared WebClient, built lazily"""
+    global client
+    if client is None:
+        from slack_sdk import WebClient
+        client = WebClient(token=SLACK_BOT_TOKEN)
+    return client
 
 # How many messages to fetch (adjust as needed)
 MESSAGE_LIMIT = 50
 
-# Option 2: Fetch bot user ID from Slack if not set
-if not BOT_USER_ID:
-    auth_resp = client.auth_test()
-    BOT_USER_ID = auth_resp["user_id"]
-    print(f"🤖 Bot user ID detected: {BOT_USER_ID}")
+# Saves adding at least this many messages are fsynced before the rename
+FSYNC_THRESHOLD = 20
+
+# auth.test result is cached on disk for this long (seconds)
+BOT_USER_ID_CACHE_TTL = 24 * 60 * 60
 
-def fetch_recent_messages(channel_id, limit=MESSAGE_LIMIT):
+@functools.lru_cache(maxsize=1)
+def _get_bot_user_id():
+    """Look up the bot user ID, reusing a per-token on-disk cache to skip auth.test"""
+    # Option 1: configured in keys.py / environment
+    if BOT_USER_ID:
+        return BOT_USER_ID
+
+    # Option 2: fetch it from Slack (only on first use, not at import)
+    token_key = hashlib.sha256(SLACK_BOT_TOKEN.encode()).hexdigest()[:16]
+    cache_path = Path.home() / ".cache" / "kettle" / f"bot_user_id_{token_key}"
     try:
-        response = client.conversations_history(channel=channel_id, limit=limit)
-        messages = response["messages"]
-        return messages
+        if time.time() - cache_path.stat().st_mtime < BOT_USER_ID_CACHE_TTL:
+            cached = cache_path.read_text().strip()
+            if cached:
+                return cached
+    except OSError:
+        pass
+
+    user_id = get_client().auth_test()["user_id"]
+    print(f"🤖 Bot user ID detected: {user_id}")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(user_id)
+    except OSError:
+        pass
+    return user_id
+
+def fetch_recent_messages(channel_id, limit=MESSAGE_LIMIT, since_ts=None):
+    """Fetch every message newer than `since_ts`, or the latest `limit` when there is no watermark"""
+    if since_ts:
+        # Slack filters on `oldest` server-side, so a poll only transfers unseen
+        # messages. Every page is needed: the watermark moves past whatever this
+        # returns, so anything left unfetched would be skipped for good.
+        params = {"channel": channel_id, "limit": 200, "oldest": str(since_ts), "inclusive": False}
+    else:
+        params = {"channel": channel_id, "limit": min(limit, 200)}
+    from slack_sdk.errors import SlackApiError
+    messages = []
+    try:
+        # SlackResponse follows response_metadata.next_cursor when iterated
+        for page in get_client().conversations_history(**params):
+            messages.extend(page["messages"])
+            if not since_ts and len(messages) >= limit:
+                break
+        return messages if since_ts else messages[:limit]
     except SlackApiError as e:
         print(f"Error fetching messages: {e.response['error']}")
-        return []
+        # A partial catch-up holds only the newest pages; saving it would move the
+        # watermark past the rest, so drop it and retry the whole gap next poll
+        return [] if since_ts else messages
 
 def messages_stale(messages, minutes=5):
     if not messages:
@@ -54,65 +108,157 @@ def get_last_processed_ts():
     except (FileNotFoundError, ValueError):
         return 0
 
-def save_messages(messages, path="json/messages.json", since_ts=None):
-    # Only keep messages not sent by the bot itself
-    filtered = [m for m in messages if m.get("user") != BOT_USER_ID]
-    
-    # Format messages for saving (new batch)
-    new_batch = []
-    for msg in filtered:
-        new_batch.append({
-            "text": msg.get("text", ""), 
-            "user": msg.get("user", ""), 
-            "ts": msg.get("ts", "")
-        })
-    
-    # Load existing messages (append mode)
-    try:
-        with open(path, "r") as f:
-            existing = json.load(f).get("messages", [])
-    except (FileNotFoundError, json.JSONDecodeError):
-        existing = []
-    
-    # Merge and de-duplicate by ts (keep latest occurrence)
-    combined_map = {m.get("ts", ""): m for m in existing if m.get("ts")}
-    for m in new_batch:
-        ts = m.get("ts")
-        if ts:
-            combined_map[ts] = m
-    combined = list(combined_map.values())
-    
-    # Sort by timestamp (newest first)
+def _ts_float(ts):
+    """Numeric value of a Slack ts string, 0.0 when missing or malformed"""
     try:
-        combined.sort(key=lambda x: float(x.get("ts", 0)), reverse=True)
-    except Exception:
-        pass
-    
-    # Create the complete messages structure
-    formatted = {"messages": combined}
-    
-    # Save merged messages
-    with open(path, "w") as f:
-        json.dump(formatted, f, indent=2)
-    
-    print(f"Saved {len(new_batch)} new messages, total now {len(combined)} (append mode)")
-    
-    # Update the last processed timestamp to the latest message
-    if combined:
+        return float(ts)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _ts_key(message):
+    return _ts_float(message.get("ts"))
+
+class SlackFetcher:
+    """Keeps messages.json in memory between polls instead of re-parsing it every save"""
+
+    def __init__(self, path="json/messages.json"):
+        self.path = path
+        self._messages = None
+        # Negated float ts, parallel to _messages, so bisect sees an ascending list
+        self._neg_ts = []
+        self._seen_ts = set()
+        self._stamp = None
+        # Socket Mode listeners may call save_messages from worker threads
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
         try:
-            latest_ts = float(combined[0].get("ts", 0))
-            with open("json/last_processed_ts.txt", "w") as f:
-                f.write(str(latest_ts))
-            print(f"Updated last processed timestamp to: {latest_ts}")
-        except Exception:
-            pass
-    else:
-        print("No messages found to save")
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        """(Re)load the stored messages only if the file changed since we last saw it"""
+        # kettle_monitor clears messages.json between batches, so the on-disk
+        # stamp decides whether the in-memory copy is still current
+        stamp = self._file_stamp()
+        if self._messages is not None and stamp == self._stamp:
+            return
+        try:
+            with open(self.path, "r") as f:
+                self._messages = json.load(f).get("messages", [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._messages = []
+        self._neg_ts = [-_ts_key(m) for m in self._messages]
+        self._seen_ts = {m.get("ts") for m in self._messages}
+        self._stamp = stamp
+
+    def save_messages(self, messages, since_ts=None):
+        with self._lock:
+            self._save_messages(messages)
+
+    def _save_messages(self, messages):
+        self._load()
+        
+        # Only messages whose ts we haven't stored yet (and not sent by the bot
+        # itself) are formatted and merged in
+        bot_user_id = _get_bot_user_id() if messages else None
+        added = [
+            {"text": msg.get("text", ""), "user": msg.get("user", ""), "ts": msg["ts"]}
+            for msg in messages
+            if msg.get("ts") and msg["ts"] not in self._seen_ts and msg.get("user") != bot_user_id
+        ]
+
+        # Nothing new: leave the file (and the watermark) alone instead of
+        # rewriting identical content every poll
+        if not added and self._stamp is not None:
+            print("No new messages to save")
+            return
+
+        # The stored list is kept newest-first; a poll only brings a handful of
+        # messages, so binary-search each into place rather than re-sorting
+        combined = self._messages
+        for m in added:
+            neg_ts = -_ts_key(m)
+            i = bisect.bisect_right(self._neg_ts, neg_ts)
+            self._neg_ts.insert(i, neg_ts)
+            combined.insert(i, m)
+        
+        # Create the complete messages structure
+        formatted = {"messages": combined}
+        
+        # Save merged messages; compact dumps() stays on the C encoder (indent= forces
+        # the pure-Python one). Writing to a temp file and renaming it over the
+        # original means a crash mid-write can't leave a truncated messages.json
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(formatted, separators=(",", ":"), ensure_ascii=False))
+            # Only pay for fsync when a sizeable batch would be costly to refetch
+            if len(added) >= FSYNC_THRESHOLD:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        
+        self._seen_ts.update(m["ts"] for m in added)
+        self._stamp = self._file_stamp()
+        
+        print(f"Saved {len(added)} new messages, total now {len(combined)} (append mode)")
+        
+        # Update the last processed timestamp to the latest message
+        if combined:
+            try:
+                latest_ts = _ts_key(combined[0])
+                with open("json/last_processed_ts.txt", "w") as f:
+                    f.write(str(latest_ts))
+                print(f"Updated last processed timestamp to: {latest_ts}")
+            except Exception:
+                pass
+        else:
+            print("No messages found to save")
+
+_fetchers = {}
+
+def get_fetcher(path="json/messages.json"):
+    """Shared SlackFetcher for `path`, so its cache survives across polls"""
+    fetcher = _fetchers.get(path)
+    if fetcher is None:
+        fetcher = _fetchers[path] = SlackFetcher(path)
+    return fetcher
+
+def save_messages(messages, path="json/messages.json", since_ts=None):
+    get_fetcher(path).save_messages(messages, since_ts=since_ts)
+
+def start_socket_mode(channel_id=SLACK_CHANNEL_ID):
+    """Receive new channel messages pushed over Socket Mode; returns the connected client"""
+    from slack_sdk.socket_mode import SocketModeClient
+    from slack_sdk.socket_mode.response import SocketModeResponse
+
+    socket_client = SocketModeClient(app_token=SLACK_APP_TOKEN, web_client=get_client())
+
+    def handle(sm_client, req):
+        if req.type != "events_api":
+            return
+        # Acknowledge first so Slack doesn't redeliver the envelope
+        sm_client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+        event = req.payload.get("event", {})
+        if event.get("type") == "message" and event.get("channel") == channel_id and not event.get("subtype"):
+            save_messages([event])
+
+    socket_client.socket_mode_request_listeners.append(handle)
+
+    # Backfill everything posted since the watermark while we weren't connected
+    # (fetch_recent_messages follows every page), then switch to push
+    main()
+    socket_client.connect()
+    print("🔌 Listening for Slack messages via Socket Mode")
+    return socket_client
 
 def main():
     print("🔍 Fetching messages from Slack...")
-    messages = fetch_recent_messages(SLACK_CHANNEL_ID)
-    save_messages(messages)
+    since_ts = get_last_processed_ts()
+    messages = fetch_recent_messages(SLACK_CHANNEL_ID, since_ts=since_ts)
+    save_messages(messages, since_ts=since_ts)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
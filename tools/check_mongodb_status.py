@@ -6,6 +6,7 @@ Check the current state of your MongoDB database anytime.
 
 import sys
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from tools.mongodb_config import get_embedding_manager, get_mongodb_config, cleanup_mongodb_connections
 
 def check_mongodb_connection():
@@ -21,7 +22,7 @@ def check_mongodb_connection():
         print("Make sure MongoDB is running: brew services start mongodb/brew/mongodb-community")
         return False
 
-def show_database_stats():
+def show_database_stats(stats=None):
     """Show comprehensive database statistics"""
     try:
         embedding_manager = get_embedding_manager()
@@ -29,8 +30,9 @@ def show_database_stats():
         print("Database Statistics")
         print("=" * 40)
         
-        # Get basic stats
-        stats = embedding_manager.get_project_stats()
+        # Get basic stats (unless main() already fetched them)
+        if stats is None:
+            stats = embedding_manager.get_project_stats()
         print(f"Total projects: {stats['total_projects']}")
         
         if stats['project_types']:
@@ -51,20 +53,21 @@ def show_database_stats():
         print(f"Error getting database stats: {e}")
         return False
 
-def list_recent_projects(limit=10):
+def list_recent_projects(limit=10, projects=None):
     """List recent projects"""
     try:
-        embedding_manager = get_embedding_manager()
-        
         print(f"Recent Projects (last {limit})")
         print("=" * 40)
         
-        projects = embedding_manager.get_all_projects(limit=limit)
+        if projects is None:
+            projects = get_embedding_manager().get_all_projects(limit=limit)
         
         if not projects:
             print("No projects found in database")
             return True
         
+        # Build the whole listing first and write it out once
+        buf = []
         for i, project in enumerate(projects, 1):
             created_at = project.get('created_at', 'Unknown')
             if isinstance(created_at, str):
@@ -74,12 +77,15 @@ def list_recent_projects(limit=10):
                 except:
                     pass
             
-            print(f"{i:2d}. {project['project_name']}")
-            print(f"    Type: {project.get('project_type', 'unknown')}")
-            print(f"    Path: {project.get('folder_path', 'unknown')}")
-            print(f"    Created: {created_at}")
-            print(f"    Messages: {len(project.get('messages', []))}")
-            print()
+            buf.append(
+                f"{i:2d}. {project['project_name']}\n"
+                f"    Type: {project.get('project_type', 'unknown')}\n"
+                f"    Path: {project.get('folder_path', 'unknown')}\n"
+                f"    Created: {created_at}\n"
+                f"    Messages: {len(project.get('messages', []))}\n"
+                "\n"
+            )
+        sys.stdout.write("".join(buf))
         
         return True
         
@@ -87,7 +93,7 @@ def list_recent_projects(limit=10):
         print(f"Error listing projects: {e}")
         return False
 
-def search_projects(query=None, project_type=None):
+def search_projects(query=None, project_type=None, query_result=None, type_result=None):
     """Search for specific projects"""
     try:
         embedding_manager = get_embedding_manager()
@@ -97,27 +103,18 @@ def search_projects(query=None, project_type=None):
         
         if query:
             print(f"Searching for: '{query}'")
-            # Simple text search in project names and messages
-            projects = embedding_manager.get_all_projects()
-            matching_projects = []
+            # Text search in project names and messages, done by MongoDB
+            result = query_result or embedding_manager.search_projects(query=query, limit=10)
             
-            for project in projects:
-                project_name = project.get('project_name', '').lower()
-                messages_text = ' '.join(project.get('messages', [])).lower()
-                
-                if query.lower() in project_name or query.lower() in messages_text:
-                    matching_projects.append(project)
-            
-            print(f"Found {len(matching_projects)} matching projects:")
-            for project in matching_projects[:10]:  # Show first 10
+            print(f"Found {result['total']} matching projects:")
+            for project in result['projects']:  # Show first 10
                 print(f"  • {project['project_name']} ({project.get('project_type', 'unknown')})")
         
         if project_type:
             print(f"Filtering by type: '{project_type}'")
-            projects = embedding_manager.get_all_projects()
-            filtered_projects = [p for p in projects if p.get('project_type') == project_type]
-            print(f"Found {len(filtered_projects)} projects of type '{project_type}':")
-            for project in filtered_projects[:10]:  # Show first 10
+            result = type_result or embedding_manager.search_projects(project_type=project_type, limit=10)
+            print(f"Found {result['total']} projects of type '{project_type}':")
+            for project in result['projects']:  # Show first 10
                 print(f"  • {project['project_name']}")
         
         return True
@@ -153,23 +150,32 @@ def main():
     if not check_mongodb_connection():
         sys.exit(1)
     
-    # Show database info
-    show_database_info()
-    
-    # Show statistics
-    show_database_stats()
-    
-    # List recent projects
-    list_recent_projects(limit=5)
-    
-    # Interactive search if arguments provided
-    if len(sys.argv) > 1:
-        query = sys.argv[1]
-        search_projects(query=query)
-    
-    if len(sys.argv) > 2:
-        project_type = sys.argv[2]
-        search_projects(project_type=project_type)
+    # The read-only queries below are independent, so issue them concurrently
+    # (PyMongo's client is thread-safe) and print the results in order
+    embedding_manager = get_embedding_manager()
+    query = sys.argv[1] if len(sys.argv) > 1 else None
+    project_type = sys.argv[2] if len(sys.argv) > 2 else None
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        f_stats = executor.submit(embedding_manager.get_project_stats)
+        f_recent = executor.submit(embedding_manager.get_all_projects, limit=5)
+        f_query = executor.submit(embedding_manager.search_projects, query=query, limit=10) if query else None
+        f_type = executor.submit(embedding_manager.search_projects, project_type=project_type, limit=10) if project_type else None
+        
+        # Show database info
+        show_database_info()
+        
+        # Show statistics
+        show_database_stats(stats=f_stats.result())
+        
+        # List recent projects
+        list_recent_projects(limit=5, projects=f_recent.result())
+        
+        # Interactive search if arguments provided
+        if f_query:
+            search_projects(query=query, query_result=f_query.result())
+        
+        if f_type:
+            search_projects(project_type=project_type, type_result=f_type.result())
     
     print("Status check complete!")
     print("Use 'python tools/check_mongodb_status.py [search_term] [project_type]' for searches")
@@ -1,31 +1,123 @@
+import ast
+import functools
+import hashlib
+import io
 import json
 import os
+import re
+import string
 import subprocess
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from utils.keys import ANTHROPIC_API_KEY
 import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from utils.prompts import execute_tasks_prompt, modify_existing_file_prompt
 import tools.project_matcher as project_matcher
 
 PHASE_ORDER = ["project_setup", "dependency_installation", "feature_implementation"]
+_PHASE_RANK = {phase: i for i, phase in enumerate(PHASE_ORDER)}
+_DEFAULT_PHASE_RANK = _PHASE_RANK["feature_implementation"]
 
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
 
+# Codebase loading: file types to include, directories to skip, files to include first
+CODE_FILE_RE = re.compile(r'\.(?:py|js|ts|jsx|tsx|html|css|scss|json|ya?ml|md|txt)$')
+SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', 'venv', '.venv', 'env', '.env', 'dist', 'build', '.pytest_cache'})
+PRIORITY_FILES = frozenset({'app.py', 'main.py', 'game.py', 'requirements.txt', 'package.json', 'Dockerfile', 'docker-compose.yml'})
+
+# Upper bound on a streamed Claude response before we stop reading it
+MAX_RESPONSE_CHARS = 200000
+
+# Fenced code blocks in Claude responses; a missing closing fence takes the rest
+_PYTHON_BLOCK_RE = re.compile(r"```python(.*?)(?:```|\Z)", re.S)
+_CODE_BLOCK_RE = re.compile(r"```[^\n]*\n?(.*?)(?:```|\Z)", re.S)
+
+# Import name -> pip package for dependencies we look for in generated scripts
+COMMON_DEPS = {
+    "flask": "flask",
+    "pygame": "pygame",
+    "requests": "requests",
+    "numpy": "numpy",
+    "pandas": "pandas",
+    "django": "django",
+    "fastapi": "fastapi",
+    "sqlalchemy": "sqlalchemy",
+    "jinja2": "jinja2",
+    "werkzeug": "werkzeug"
+}
+
+# Everything validate/inject look for, matched in one pass; the pip group also
+# covers the list form used by generated scripts: "-m", "pip", "install"
+_SCRIPT_KEYWORDS_RE = re.compile(
+    "|".join(COMMON_DEPS) + r"|virtualenv|venv|subprocess\.run"
+    r"""|(?P<pip>pip['"]?\s*,?\s*['"]?install)""",
+    re.IGNORECASE
+)
+
+# Where find_closest_project results are cached, and for how long (seconds);
+# set KETTLE_NO_MATCH_CACHE=1 to bypass
+PROJECT_MATCH_CACHE_DIR = Path(".cache/project_matcher")
+PROJECT_MATCH_CACHE_TTL = 24 * 60 * 60
+
+# Seconds a generated bootstrap script may run before it is killed
+SCRIPT_TIMEOUT = 1800
+
+ANTHROPIC_HEADERS = {
+    "x-api-key": ANTHROPIC_API_KEY,
+    "Content-Type": "application/json",
+    "anthropic-version": "2023-06-01"
+}
+
+# Shared keep-alive session so repeated Claude calls reuse one TLS connection;
+# transient overload/5xx responses are retried with backoff
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=None, raise_on_status=False)
+))
+
 def load_phased_tasks(filepath="json/phased_tasks.json"):
-    with open(filepath, "r") as f:
-        return json.load(f)
+    # json.loads takes bytes directly, skipping the text-mode decode layer
+    with open(filepath, "rb") as f:
+        return json.loads(f.read())
+
+_FAST_QUOTE_TRANS = str.maketrans({"'": '"'})
+
+@functools.lru_cache(maxsize=4096)
+def _parse_dict_literal(text):
+    """Parse a dict written as JSON or as a Python literal; identical keys recur, so cache"""
+    # Plain task text is common; don't spin up either parser for it
+    if not text.lstrip().startswith("{"):
+        raise ValueError("not a dict literal")
+    # json.loads is far cheaper than building an AST, so try it first
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    # repr()'d dicts use single quotes; safe to swap when no double quotes appear
+    if '"' not in text:
+        try:
+            return json.loads(text.translate(_FAST_QUOTE_TRANS))
+        except json.JSONDecodeError:
+            pass
+    return ast.literal_eval(text)
 
 def parse_task_key(task_key):
     """Parse the task key to extract task information"""
     try:
         # Remove the outer quotes and parse the inner dict
         task_key = task_key.strip('"\'')
-        # Convert string representation of dict to actual dict
-        import ast
-        task_dict = ast.literal_eval(task_key)
-        return task_dict
+        # Copy so callers can't mutate the cached entry
+        return dict(_parse_dict_literal(task_key))
     except:
         # Fallback: treat as simple string
         return {"task": task_key, "source": "unknown", "phase": "feature_implementation"}
@@ -76,8 +168,7 @@ def flatten_hierarchical_tasks(phased_tasks):
                     if coding_task.startswith("Implement "):
                         task_content = coding_task[10:]  # Remove "Implement " prefix
                         try:
-                            import ast
-                            task_dict = ast.literal_eval(task_content)
+                            task_dict = dict(_parse_dict_literal(task_content))
                             flat_tasks.append(task_dict)
                             print(f"    💻 Coding: {task_dict.get('task', task_content)}")
                         except:
@@ -103,78 +194,113 @@ def flatten_hierarchical_tasks(phased_tasks):
     return flat_tasks
 
 def sort_tasks_by_phase(tasks):
-    return sorted(tasks, key=lambda t: PHASE_ORDER.index(t.get("phase", "feature_implementation")))
+    return sorted(tasks, key=lambda t: _PHASE_RANK.get(t.get("phase", "feature_implementation"), _DEFAULT_PHASE_RANK))
+
+def _iter_code_files(folder):
+    """Yield (path, size) for candidate files under `folder`, priority files first per directory"""
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    # DirEntry caches the file type (and usually the stat), so no extra syscalls here
+    files = [
+        e for e in entries
+        if e.is_file() and (CODE_FILE_RE.search(e.name) or e.name in PRIORITY_FILES)
+    ]
+    files.sort(key=lambda e: (e.name not in PRIORITY_FILES, e.name))
+    for entry in files:
+        yield entry.path, entry.stat().st_size
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False) and entry.name not in SKIP_DIRS:
+            yield from _iter_code_files(entry.path)
+
+def _read_text(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read().decode('utf-8', errors='replace')
+    except Exception as e:
+        print(f"Warning: Could not read {path}: {e}")
+        return None
 
 def load_codebase(project_folder):
     """Load existing codebase from a project folder for LLM input"""
     codebase = {}
-    
+
     if not os.path.exists(project_folder):
         return codebase
-    
-    # Common file extensions to include
-    code_extensions = {'.py', '.js', '.ts', '.jsx', '.tsx', '.html', '.css', '.scss', '.json', '.yaml', '.yml', '.md', '.txt'}
-    
-    # Directories to skip
-    skip_dirs = {'.git', '__pycache__', 'node_modules', 'venv', '.venv', 'env', '.env', 'dist', 'build', '.pytest_cache'}
-    
-    # Files to prioritize (include these first)
-    priority_files = {'app.py', 'main.py', 'game.py', 'requirements.txt', 'package.json', 'Dockerfile', 'docker-compose.yml'}
-    
+
     total_size = 0
     max_total_size = 50000  # 50KB limit to prevent API token issues
-    
-    for root, dirs, files in os.walk(project_folder):
-        # Skip unwanted directories
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-        
-        # Sort files to prioritize important ones
-        files = sorted(files, key=lambda f: (f not in priority_files, f))
-        
-        for file in files:
-            file_path = os.path.join(root, file)
-            rel_path = os.path.relpath(file_path, project_folder)
-            
-            # Only include code files and important config files
-            if any(file.endswith(ext) for ext in code_extensions) or file in priority_files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Skip if adding this file would exceed size limit
-                    if total_size + len(content) > max_total_size:
-                        print(f"⚠️  Skipping {rel_path} to stay within size limit")
-                        continue
-                    
-                    codebase[rel_path] = content
-                    total_size += len(content)
-                    
-                    # Stop if we've reached the size limit
-                    if total_size >= max_total_size:
-                        print(f"⚠️  Reached size limit ({total_size} chars), stopping codebase loading")
-                        break
-                        
-                except Exception as e:
-                    print(f"Warning: Could not read {rel_path}: {e}")
-        
-        # Stop walking if we've reached the size limit
+
+    # Pick files against the budget using the sizes from the directory scan
+    # (bytes >= decoded chars, so the selection never overshoots the limit)
+    selected = []
+    for file_path, size in _iter_code_files(project_folder):
+        rel_path = os.path.relpath(file_path, project_folder)
+
+        # Oversized files are never opened
+        if total_size + size > max_total_size:
+            print(f"⚠️  Skipping {rel_path} to stay within size limit")
+            continue
+
+        selected.append((rel_path, file_path))
+        total_size += size
+
+        # Stop if we've reached the size limit
         if total_size >= max_total_size:
+            print(f"⚠️  Reached size limit ({total_size} bytes), stopping codebase loading")
             break
-    
+
+    # Reads are I/O-bound, so overlap them; map() keeps the priority order
+    total_size = 0
+    with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 4)) as executor:
+        for (rel_path, _), content in zip(selected, executor.map(_read_text, [p for _, p in selected])):
+            if content is None:
+                continue
+            codebase[rel_path] = content
+            total_size += len(content)
+
     print(f"📁 Loaded {len(codebase)} files ({total_size} chars) from {project_folder}")
     return codebase
 
+def _read_streamed_text(response):
+    """Collect text deltas from a streamed Messages response (server-sent events)"""
+    buf = io.StringIO()
+    size = 0
+    for line in response.iter_lines():
+        if not line.startswith(b"data: "):
+            continue
+        event = json.loads(line[6:])
+        event_type = event.get("type")
+        if event_type == "content_block_delta":
+            text = event["delta"].get("text", "")
+            buf.write(text)
+            size += len(text)
+            if size > MAX_RESPONSE_CHARS:
+                print(f"⚠️  Response exceeded {MAX_RESPONSE_CHARS} chars, stopping early")
+                break
+            # clean_code_blocks only keeps the first ```python block, so once
+            # that block has closed the rest of the generation is never used
+            if "`" in text:
+                value = buf.getvalue()
+                if "```python" in value and "```" in value.split("```python", 1)[1]:
+                    break
+        elif event_type == "message_stop":
+            break
+        elif event_type == "error":
+            raise RuntimeError(f"Stream error: {event.get('error')}")
+    return buf.getvalue()
+
 def call_claude(prompt):
-    headers = {
-        "x-api-key": ANTHROPIC_API_KEY,
-        "Content-Type": "application/json",
-        "anthropic-version": "2023-06-01"
-    }
     body = {
         "model": "claude-3-5-sonnet-20241022",
         "max_tokens": 8000,
         "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3
+        "temperature": 0.3,
+        "stream": True
     }
     
     # Debug: Print prompt size
@@ -184,9 +310,11 @@ def call_claude(prompt):
         print("⚠️  Warning: Prompt is very large, may cause API issues")
     
     try:
-        response = requests.post(ANTHROPIC_API_URL, headers=headers, json=body)
+        response = _SESSION.post(ANTHROPIC_API_URL, headers=ANTHROPIC_HEADERS, json=body,
+                                 timeout=(5, 120), stream=True)
         response.raise_for_status()
-        return response.json()["content"][0]["text"]
+        with response:
+            return _read_streamed_text(response)
     except requests.exceptions.HTTPError as e:
         print(f"❌ API Error: {e}")
         print(f"Response status: {response.status_code}")
@@ -197,230 +325,319 @@ def call_claude(prompt):
         raise
 
 def clean_code_blocks(response: str) -> str:
-    if "```python" in response:
-        return response.split("```python")[1].split("```")[0].strip()
-    elif "```" in response:
-        return response.split("```")[1].strip()
+    # A ```python block wins over any other fenced block that precedes it
+    match = _PYTHON_BLOCK_RE.search(response) or _CODE_BLOCK_RE.search(response)
+    if match:
+        return match.group(1).strip()
     return response.strip()
 
+def _relay_output(stream):
+    for line in stream:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
 def execute_script(script_code):
     with tempfile.NamedTemporaryFile(mode="w+", suffix=".py", delete=False) as f:
         f.write(script_code)
         temp_path = f.name
 
-    print(f"\n🚀 Executing bootstrap script: {temp_path}")
+    print(f"\n🚀 Executing bootstrap script: {temp_path}", flush=True)
     try:
-        subprocess.run(["python3", temp_path], check=True)
-        print("✅ Script executed successfully.")
-    except subprocess.CalledProcessError as e:
-        print("❌ Script failed:", e)
+        # Relay the child's output line by line as it runs, and kill it if it hangs.
+        # Undecodable bytes are replaced, so a stray byte can't kill the relay and
+        # leave the child blocked on a full pipe.
+        proc = subprocess.Popen(["python3", temp_path], stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, encoding="utf-8",
+                                errors="replace", bufsize=1)
+        relay = threading.Thread(target=_relay_output, args=(proc.stdout,), daemon=True)
+        relay.start()
+        timed_out = False
+        try:
+            proc.wait(timeout=SCRIPT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            proc.kill()
+            proc.wait()
+        # Let the relay drain, but don't block on background processes the
+        # script left holding the pipe open
+        relay.join(timeout=1)
+
+        if timed_out:
+            print(f"❌ Script failed: killed after {SCRIPT_TIMEOUT}s timeout")
+        elif proc.returncode == 0:
+            print("✅ Script executed successfully.")
+        else:
+            print(f"❌ Script failed: exit status {proc.returncode}")
     finally:
         os.remove(temp_path)
         print(f"🧹 Deleted temp file: {temp_path}")
 
+def _scan_script(script_code):
+    """Lowercased keyword hits in a generated script, from a single regex pass"""
+    found = set()
+    for m in _SCRIPT_KEYWORDS_RE.finditer(script_code):
+        found.add("pip install" if m.group("pip") else m.group(0).lower())
+    return found
+
 def validate_script(script_code):
     required_imports = ["import os", "import subprocess", "import sys"]
     for imp in required_imports:
         if imp not in script_code:
             raise ValueError(f"🚨 Missing import: {imp}")
     
+    found = _scan_script(script_code)
+    
     # Check for virtual environment creation
-    if "venv" not in script_code.lower() and "virtualenv" not in script_code.lower():
+    if "venv" not in found and "virtualenv" not in found:
         print("⚠️  Warning: Script may not create virtual environment")
     
     # Check for pip install commands
-    if "pip install" not in script_code.lower() and "subprocess.run" not in script_code.lower():
+    if "pip install" not in found and "subprocess.run" not in found:
         print("⚠️  Warning: Script may not install dependencies")
     
     # Check for common dependency patterns that should trigger installation
-    common_deps = ["flask", "pygame", "requests", "numpy", "pandas", "django", "fastapi"]
-    found_deps = [dep for dep in common_deps if dep in script_code.lower()]
+    found_deps = [dep for dep in COMMON_DEPS if dep in found]
     if found_deps:
         print(f"🔍 Found potential dependencies: {found_deps}")
-        if "pip install" not in script_code.lower():
+        if "pip install" not in found:
             print("⚠️  Warning: Dependencies detected but no pip install found")
 
 def inject_dependencies_if_missing(script_code):
     """Inject dependency installation if missing from the script"""
-    common_deps = {
-        "flask": "flask",
-        "pygame": "pygame", 
-        "requests": "requests",
-        "numpy": "numpy",
-        "pandas": "pandas",
-        "django": "django",
-        "fastapi": "fastapi",
-        "sqlalchemy": "sqlalchemy",
-        "jinja2": "jinja2",
-        "werkzeug": "werkzeug"
-    }
+    found = _scan_script(script_code)
     
     # Find dependencies used in the script
-    used_deps = []
-    for dep_name, pip_name in common_deps.items():
-        if dep_name in script_code.lower():
-            used_deps.append(pip_name)
+    used_deps = [pip_name for dep_name, pip_name in COMMON_DEPS.items() if dep_name in found]
     
     if not used_deps:
         return script_code
     
     # Check if pip install is already present
-    if "pip install" in script_code.lower():
+    if "pip install" in found:
         return script_code
     
-    # Inject dependency installation after venv creation
-    lines = script_code.split('\n')
-    new_lines = []
-    venv_created = False
+    # Inject dependency installation after the first line that creates the venv;
+    # splice it in rather than splitting and re-joining every line of the script
+    match = re.search(r"venv|virtualenv", script_code, re.IGNORECASE)
+    if not match:
+        return script_code
+    line_end = script_code.find('\n', match.end())
+    if line_end == -1:
+        line_end = len(script_code)
     
-    for line in lines:
-        new_lines.append(line)
-        
-        # After venv creation, inject pip install
-        if ("venv" in line.lower() or "virtualenv" in line.lower()) and not venv_created:
-            venv_created = True
-            new_lines.append("")
-            new_lines.append("# Install dependencies")
-            for dep in used_deps:
-                new_lines.append(f'subprocess.run([sys.executable, "-m", "pip", "install", "{dep}"], check=True)')
-            new_lines.append("")
+    buf = io.StringIO()
+    buf.write(script_code[:line_end])
+    buf.write("\n\n# Install dependencies\n")
+    buf.write(f'subprocess.run([sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-input", "-q", {", ".join(repr(dep) for dep in used_deps)}], check=True)')
+    buf.write("\n")
+    buf.write(script_code[line_end:])
+    return buf.getvalue()
+
+# Keyword groups that route a task to the file it most likely touches
+FILE_ROUTES = (
+    (("game", "pygame", "flappy"), "game.py"),
+    (("web", "flask", "app", "server"), "app.py"),
+)
+
+def route_task_to_file(task_desc):
+    """Pick the file a task should modify, defaulting to main.py"""
+    task_lower = task_desc.lower()
+    for keywords, file_name in FILE_ROUTES:
+        if any(keyword in task_lower for keyword in keywords):
+            return file_name
+    return "main.py"
+
+# Script generated for modifying an existing project; the preservation rules and
+# request plumbing are fixed, only the folder, task list and file routing vary
+_EXISTING_PROJECT_SCRIPT_TEMPLATE = string.Template("""import os
+import re
+import subprocess
+import sys
+import json
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Project folder: $project_folder
+project_folder = '$project_folder'
+
+# API configuration
+ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
+ANTHROPIC_API_URL = 'https://api.anthropic.com/v1/messages'
+ANTHROPIC_HEADERS = {
+    'x-api-key': ANTHROPIC_API_KEY,
+    'Content-Type': 'application/json',
+    'anthropic-version': '2023-06-01'
+}
+
+# Files modified concurrently (each file's own tasks still run in order)
+MAX_PARALLEL_FILES = 4
+
+# First fenced block in a response (language tag dropped; closing fence optional)
+CODE_BLOCK_RE = re.compile(r'```[^\\n]*\\n(.*?)(?:```|\\Z)', re.S)
+
+# Reuse one keep-alive connection for every file modification
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=None, raise_on_status=False)
+))
+
+# Invariant instructions appended to every file modification prompt
+PRESERVATION_RULES = '''**ABSOLUTELY CRITICAL RULES:**
+1. **PRESERVE ALL EXISTING FUNCTIONALITY** - The file must work exactly as before
+2. **ADDITIVE CHANGES ONLY** - Only add new code, never modify existing code
+3. **NO REFACTORING** - Do not reorganize, restructure, or improve existing code
+4. **NO BUG FIXES** - Do not fix existing bugs unless explicitly requested
+5. **NO STYLE CHANGES** - Do not change formatting, variable names, or code style
+6. **NO IMPORT MODIFICATIONS** - Do not change existing import statements
+7. **NO FUNCTION CHANGES** - Do not modify existing function signatures or logic
+8. **NO CLASS MODIFICATIONS** - Do not modify existing class definitions
+
+**REQUIRED APPROACH:**
+1. Read the existing file content (provided above)
+2. Add new code at the end (before any main execution block like `if __name__ == '__main__':`)
+3. Do not modify any existing code
+4. Only add new imports if absolutely necessary for the new feature
+5. Ensure the new feature integrates with existing functionality without breaking it
+
+**RETURN FORMAT:**
+Return ONLY the complete updated file content with your additions. Do not include explanations or markdown formatting.
+'''
+
+def call_claude(prompt):
+    body = {
+        'model': 'claude-3-5-sonnet-20241022',
+        'max_tokens': 8000,
+        'messages': [{'role': 'user', 'content': prompt}],
+        'temperature': 0.1  # Lower temperature for more consistent modifications
+    }
+    response = _SESSION.post(ANTHROPIC_API_URL, headers=ANTHROPIC_HEADERS, json=body, timeout=(5, 120))
+    response.raise_for_status()
+    return response.json()['content'][0]['text']
+
+def modify_file_with_preservation(file_path, task_descriptions):
+    print(f'Modifying {file_path} ({len(task_descriptions)} task(s)) with preservation rules...')
+    
+    # Read existing file content
+    with open(file_path, 'r') as f:
+        existing_content = f.read()
+    
+    # All tasks for this file go into one request, so the file content and
+    # rules are sent once instead of once per task
+    task_list = '\\n'.join(f'- {task}' for task in task_descriptions)
+    
+    # Create specialized prompt for file modification
+    prompt = f'''You are modifying an existing file: {file_path}
+
+**TASKS TO IMPLEMENT (apply all of them, in order):**
+{task_list}
+
+**EXISTING FILE CONTENT:**
+```
+{existing_content}
+```
+
+{PRESERVATION_RULES}'''
+    
+    # Get modified content from Claude
+    modified_content = call_claude(prompt)
     
-    return '\n'.join(new_lines)
+    # Clean up the response (keep only the fenced block's body if markdown was used)
+    match = CODE_BLOCK_RE.search(modified_content)
+    if match:
+        modified_content = match.group(1)
+    
+    # Write the modified content back to the file
+    with open(file_path, 'w') as f:
+        f.write(modified_content)
+    
+    print(f'✅ Successfully modified {file_path}')
+
+# Tasks to implement:
+$task_comments
+# Main execution
+print('🔧 Starting modifications with strict preservation rules...')
+
+# Files to modify with their tasks (in order), grouped when this script was generated
+files_to_modify = [
+$file_routing]
+
+# Apply modifications: one batched request per file, different files in parallel
+def apply_file_tasks(file_path, task_descriptions):
+    full_path = os.path.join(project_folder, file_path)
+    if not os.path.exists(full_path):
+        print(f'⚠️  File {full_path} does not exist, skipping')
+        return
+    modify_file_with_preservation(full_path, task_descriptions)
+
+with ThreadPoolExecutor(max_workers=MAX_PARALLEL_FILES) as executor:
+    futures = [executor.submit(apply_file_tasks, fp, tds) for fp, tds in files_to_modify]
+    for future in futures:
+        future.result()
+
+print('✅ All modifications completed with preservation rules')""")
 
 def generate_script_for_existing_project(ordered_tasks, existing_project_folder, codebase):
     """Generate a script specifically for modifying existing projects with strict preservation rules"""
     print(f"🔧 Generating modification script for existing project: {existing_project_folder}")
     
-    # Create a script that uses the specialized prompt for each file modification
-    script_lines = [
-        "import os",
-        "import subprocess", 
-        "import sys",
-        "import json",
-        "import requests",
-        "",
-        f"# Project folder: {existing_project_folder}",
-        f"project_folder = '{existing_project_folder}'",
-        "",
-        "# API configuration",
-        "ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')",
-        "ANTHROPIC_API_URL = 'https://api.anthropic.com/v1/messages'",
-        "",
-        "def call_claude(prompt):",
-        "    headers = {",
-        "        'x-api-key': ANTHROPIC_API_KEY,",
-        "        'Content-Type': 'application/json',",
-        "        'anthropic-version': '2023-06-01'",
-        "    }",
-        "    body = {",
-        "        'model': 'claude-3-5-sonnet-20241022',",
-        "        'max_tokens': 8000,",
-        "        'messages': [{'role': 'user', 'content': prompt}],",
-        "        'temperature': 0.1  # Lower temperature for more consistent modifications",
-        "    }",
-        "    response = requests.post(ANTHROPIC_API_URL, headers=headers, json=body)
-",
-        "    response.raise_for_status()",
-        "    return response.json()['content'][0]['text']",
-        "",
-        "def modify_file_with_preservation(file_path, task_description):",
-        "    print(f'Modifying {file_path} with preservation rules...')",
-        "    ",
-        "    # Read existing file content",
-        "    with open(file_path, 'r') as f:",
-        "        existing_content = f.read()",
-        "    ",
-        "    # Create specialized prompt for file modification",
-        "    prompt = f'''You are modifying an existing file: {file_path}",
-        "",
-        "**TASK TO IMPLEMENT:**",
-        f"{''}",
-        "",
-        "**EXISTING FILE CONTENT:**",
-        "```",
-        f"{{existing_content}}",
-        "```",
-        "",
-        "**ABSOLUTELY CRITICAL RULES:**",
-        "1. **PRESERVE ALL EXISTING FUNCTIONALITY** - The file must work exactly as before",
-        "2. **ADDITIVE CHANGES ONLY** - Only add new code, never modify existing code", 
-        "3. **NO REFACTORING** - Do not reorganize, restructure, or improve existing code",
-        "4. **NO BUG FIXES** - Do not fix existing bugs unless explicitly requested",
-        "5. **NO STYLE CHANGES** - Do not change formatting, variable names, or code style",
-        "6. **NO IMPORT MODIFICATIONS** - Do not change existing import statements",
-        "7. **NO FUNCTION CHANGES** - Do not modify existing function signatures or logic",
-        "8. **NO CLASS MODIFICATIONS** - Do not modify existing class definitions",
-        "",
-        "**REQUIRED APPROACH:**",
-        "1. Read the existing file content (provided above)",
-        "2. Add new code at the end (before any main execution block like `if __name__ == '__main__':`)",
-        "3. Do not modify any existing code",
-        "4. Only add new imports if absolutely necessary for the new feature",
-        "5. Ensure the new feature integrates with existing functionality without breaking it",
-        "",
-        "**RETURN FORMAT:**",
-        "Return ONLY the complete updated file content with your additions. Do not include explanations or markdown formatting.",
-        "'''",
-        "    ",
-        "    # Get modified content from Claude",
-        "    modified_content = call_claude(prompt)",
-        "    ",
-        "    # Clean up the response (remove markdown if present)",
-        "    if '```' in modified_content:",
-        "        modified_content = modified_content.split('```')[1] if len(modified_content.split('```')) > 1 else modified_content",
-        "    ",
-        "    # Write the modified content back to the file",
-        "    with open(file_path, 'w') as f:",
-        "        f.write(modified_content)",
-        "    ",
-        "    print(f'✅ Successfully modified {file_path}')",
-        "",
-        "# Tasks to implement:",
-    ]
-    
-    # Add task descriptions
+    # Only the task comments and the file routing vary per run; everything else
+    # comes from the pre-built template
+    task_comments = io.StringIO()
     for i, task in enumerate(ordered_tasks, 1):
-        script_lines.append(f"# {i}. {task['task']} (phase: {task['phase']})")
-    
-    script_lines.extend([
-        "",
-        "# Main execution",
-        "print('🔧 Starting modifications with strict preservation rules...')",
-        "",
-        "# Determine which files to modify based on tasks",
-        "files_to_modify = []",
-    ])
-    
-    # Add logic to determine which files to modify
+        task_comments.write(f"# {i}. {task['task']} (phase: {task['phase']})\n")
+
+    # Decide each task's target file now and group the tasks per file, so the
+    # script does one read/modify/write per file with all of that file's tasks
+    tasks_by_file = {}
     for task in ordered_tasks:
         task_desc = task['task']
-        script_lines.extend([
-            f"# Task: {task_desc}",
-            f"if any(keyword in '{task_desc}'.lower() for keyword in ['game', 'pygame', 'flappy']):",
-            "    files_to_modify.append(('game.py', f'Add feature: {task_desc}'))",
-            "elif any(keyword in '{task_desc}'.lower() for keyword in ['web', 'flask', 'app', 'server']):",
-            "    files_to_modify.append(('app.py', f'Add feature: {task_desc}'))",
-            "else:",
-            "    files_to_modify.append(('main.py', f'Add feature: {task_desc}'))",
-        ])
+        tasks_by_file.setdefault(route_task_to_file(task_desc), []).append(f'Add feature: {task_desc}')
+
+    file_routing = io.StringIO()
+    for file_name, task_descriptions in tasks_by_file.items():
+        file_routing.write(f"    ({file_name!r}, {task_descriptions!r}),\n")
+
+    return _EXISTING_PROJECT_SCRIPT_TEMPLATE.substitute(
+        project_folder=existing_project_folder,
+        task_comments=task_comments.getvalue(),
+        file_routing=file_routing.getvalue(),
+    )
+
+def find_closest_project_cached(query_messages):
+    """project_matcher.find_closest_project, with matches remembered on disk per task set"""
+    use_cache = not os.environ.get("KETTLE_NO_MATCH_CACHE")
+    digest = hashlib.blake2b("\n".join(sorted(query_messages)).encode(), digest_size=16).hexdigest()
+    cache_path = PROJECT_MATCH_CACHE_DIR / f"{digest}.json"
+    
+    if use_cache:
+        try:
+            if time.time() - cache_path.stat().st_mtime < PROJECT_MATCH_CACHE_TTL:
+                cached = json.loads(cache_path.read_bytes())
+                # Ignore the entry if the project has since been removed
+                if os.path.isdir(cached["project"]):
+                    return cached["project"], cached["similarity"]
+        except (OSError, ValueError, KeyError):
+            pass
     
-    script_lines.extend([
-        "",
-        "# Apply modifications",
-        "for file_path, task_description in files_to_modify:",
-        "    full_path = os.path.join(project_folder, file_path)",
-        "    if os.path.exists(full_path):",
-        "        modify_file_with_preservation(full_path, task_description)",
-        "    else:",
-        "        print(f'⚠️  File {full_path} does not exist, skipping')",
-        "",
-        "print('✅ All modifications completed with preservation rules')",
-    ])
+    closest_project, similarity = project_matcher.find_closest_project(query_messages)
     
-    return '\n'.join(script_lines)
+    # Only matches are cached: after a miss a new project gets created, and the
+    # next run with the same tasks should be able to find it
+    if use_cache and closest_project:
+        try:
+            PROJECT_MATCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({"project": closest_project, "similarity": float(similarity)}))
+        except OSError:
+            pass
+    return closest_project, similarity
 
-def main(existing_project_folder=None):
-    phased_tasks = load_phased_tasks()
+def main(existing_project_folder=None, tasks=None):
+    phased_tasks = load_phased_tasks() if tasks is None else tasks
     
     # Convert hierarchical structure to flat list (coding tasks only)
     print("🔄 Processing hierarchical tasks...")
@@ -434,12 +651,18 @@ def main(existing_project_folder=None):
     
     # Sort tasks by phase
     ordered_tasks = sort_tasks_by_phase(flat_tasks)
+    # Tasks piped in by the web API include the rejected ones (for the prompt's
+    # do-not-implement list); only the selected ones are matched and built
+    if tasks is not None:
+        build_tasks = [t for t in ordered_tasks if t.get('selectionStatus') == 'selected']
+    else:
+        build_tasks = ordered_tasks
 
     # If no explicit folder was provided, try to select the closest existing project by embeddings
     if existing_project_folder is None:
         try:
-            query_messages = [t.get('task', '') for t in ordered_tasks if t.get('task')]
-            closest_project, similarity = project_matcher.find_closest_project(query_messages)
+            query_messages = [t.get('task', '') for t in build_tasks if t.get('task')]
+            closest_project, similarity = find_closest_project_cached(query_messages)
             if closest_project:
                 print(f"🔎 Found closest existing project: {closest_project} (sim={similarity:.2f})")
                 existing_project_folder = closest_project
@@ -454,7 +677,7 @@ def main(existing_project_folder=None):
         codebase = load_codebase(existing_project_folder)
         
         # Use specialized script for existing projects
-        script = generate_script_for_existing_project(ordered_tasks, existing_project_folder, codebase)
+        script = generate_script_for_existing_project(build_tasks, existing_project_folder, codebase)
     else:
         # Use regular prompt for new projects
         prompt = execute_tasks_prompt(ordered_tasks)
@@ -492,8 +715,8 @@ def main(existing_project_folder=None):
     # Use the actual project folder that was created/modified
     if actual_project_folder:
         try:
-            with open("json/messages.json", "r") as f:
-                data = json.load(f)
+            with open("json/messages.json", "rb") as f:
+                data = json.loads(f.read())
                 messages = [msg.get("text", "") for msg in data.get("messages", [])]
             project_matcher.save_project_embedding(actual_project_folder, messages)
             print(f"✅ Saved embedding for project: {actual_project_folder}")
@@ -503,4 +726,8 @@ def main(existing_project_folder=None):
         print("[WARN] Could not determine actual project folder for embedding")
 
 if __name__ == "__main__":
-    main()
+    # The web API pipes in the selected and rejected tasks rather than using phased_tasks.json
+    if "--stdin" in sys.argv[1:]:
+        main(tasks=json.loads(sys.stdin.buffer.read()))
+    else:
+        main()
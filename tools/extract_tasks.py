@@ -11,6 +11,29 @@ import tools.research_processor as research_processor
 # Use the modern messages endpoint
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
 
+# Keywords used by categorize_tasks_by_type (built once, not per task)
+CODING_KEYWORDS = (
+    "code", "program", "script", "app", "application", "website", "web app", 
+    "api", "database", "server", "client", "frontend", "backend", "game",
+    "function", "class", "module", "package", "library", "framework",
+    "install", "setup", "configure", "deploy", "build", "compile",
+    "test", "debug", "fix", "bug", "error", "exception"
+)
+
+RESEARCH_KEYWORDS = (
+    "research", "find", "search", "look up", "investigate", "explore",
+    "study", "analyze", "examine", "review", "survey", "gather",
+    "collect", "discover", "learn about", "understand", "explore",
+    "market research", "competitor analysis", "user research"
+)
+
+WRITING_KEYWORDS = (
+    "write", "document", "report", "analysis", "summary", "review",
+    "proposal", "plan", "strategy", "documentation", "manual",
+    "guide", "tutorial", "article", "blog", "content", "copy",
+    "draft", "create document", "prepare report"
+)
+
 def call_claude_for_summary(prompt_text: str) -> str:
     """Call Claude for generating readable summaries (returns plain text, not JSON)"""
     headers = {
@@ -282,33 +305,10 @@ def categorize_tasks_by_type(tasks):
         task_text = task.get("task", "").lower()
         source_text = task.get("source", "").lower()
         
-        # Keywords for each category
-        coding_keywords = [
-            "code", "program", "script", "app", "application", "website", "web app", 
-            "api", "database", "server", "client", "frontend", "backend", "game",
-            "function", "class", "module", "package", "library", "framework",
-            "install", "setup", "configure", "deploy", "build", "compile",
-            "test", "debug", "fix", "bug", "error", "exception"
-        ]
-        
-        research_keywords = [
-            "research", "find", "search", "look up", "investigate", "explore",
-            "study", "analyze", "examine", "review", "survey", "gather",
-            "collect", "discover", "learn about", "understand", "explore",
-            "market research", "competitor analysis", "user research"
-        ]
-        
-        writing_keywords = [
-            "write", "document", "report", "analysis", "summary", "review",
-            "proposal", "plan", "strategy", "documentation", "manual",
-            "guide", "tutorial", "article", "blog", "content", "copy",
-            "draft", "create document", "prepare report"
-        ]
-        
         # Score each category
-        coding_score = sum(1 for keyword in coding_keywords if keyword in task_text or keyword in source_text)
-        research_score = sum(1 for keyword in research_keywords if keyword in task_text or keyword in source_text)
-        writing_score = sum(1 for keyword in writing_keywords if keyword in task_text or keyword in source_text)
+        coding_score = sum(1 for keyword in CODING_KEYWORDS if keyword in task_text or keyword in source_text)
+        research_score = sum(1 for keyword in RESEARCH_KEYWORDS if keyword in task_text or keyword in source_text)
+        writing_score = sum(1 for keyword in WRITING_KEYWORDS if keyword in task_text or keyword in source_text)
         
         # Determine the best category
         scores = {
@@ -449,8 +449,8 @@ def call_claude(prompt_text: str) -> str:
         print(f"Debug: Response text: {resp.text}")
         resp.raise_for_status()
 
-    # The `content` field contains the assistant's response
-    return resp.json()["content"][0]["text"].strip()
+    # The `content` field contains the assistant's response (parsed from raw bytes)
+    return json.loads(resp.content)["content"][0]["text"].strip()
 
 
 def main():
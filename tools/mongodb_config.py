@@ -5,19 +5,62 @@ Handles database connections, collections, and basic operations.
 """
 
 import os
+import re
 import json
+import base64
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from pymongo import MongoClient
+import numpy as np
+from pymongo import MongoClient, ReplaceOne
 from pymongo.collection import Collection
 from pymongo.database import Database
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.errors import BulkWriteError, ConnectionFailure, ServerSelectionTimeoutError
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keyword patterns per project type, checked in order; the first match wins
+_TYPE_RE = {
+    "game": re.compile(r"game|pygame|flappy|tic-tac-toe", re.IGNORECASE),
+    "web_app": re.compile(r"web|flask|app|website|api", re.IGNORECASE),
+    "script": re.compile(r"script|automation|tool", re.IGNORECASE),
+    "research": re.compile(r"research|analysis|report", re.IGNORECASE),
+}
+
+def infer_project_type(folder_path: str, messages: List[str]) -> str:
+    """Infer project type from folder path and messages"""
+    # Keywords contain no newlines, so joining can't create a match across two inputs
+    haystack = "\n".join([folder_path, *messages])
+    for project_type, pattern in _TYPE_RE.items():
+        if pattern.search(haystack):
+            return project_type
+    return "unknown"
+
+def encode_embedding_f16(embedding: List[float]) -> str:
+    """Pack an embedding as base64 float16 bytes for the JSON store"""
+    return base64.b64encode(np.asarray(embedding, dtype=np.float16).tobytes()).decode("ascii")
+
+def decode_embedding_f16(encoded: str) -> np.ndarray:
+    """Unpack a base64 float16 embedding from the JSON store as float32"""
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.float16).astype(np.float32)
+
+def quantize_embedding(embedding: List[float]) -> Dict[str, Any]:
+    """Quantize an embedding to int8 codes with a per-vector scale"""
+    vec = np.asarray(embedding, dtype=np.float32)
+    max_abs = float(np.abs(vec).max()) if vec.size else 0.0
+    scale = max_abs / 127 if max_abs else 1.0
+    codes = np.round(vec / scale).astype(np.int8)
+    return {"embedding_i8": codes.tobytes(), "embedding_scale": scale}
+
+def dequantize_embedding(document: Dict[str, Any]) -> np.ndarray:
+    """Return a document's embedding as float32, preferring the int8 codes"""
+    codes = document.get("embedding_i8")
+    if codes is None:
+        return np.asarray(document.get("embedding", []), dtype=np.float32)
+    return np.frombuffer(codes, dtype=np.int8).astype(np.float32) * document["embedding_scale"]
+
 class MongoDBConfig:
     """MongoDB configuration and connection manager"""
     
@@ -127,7 +170,8 @@ class ProjectEmbeddingManager:
                 "metadata": metadata or {},
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow(),
-                "embedding_dimension": len(embedding)
+                "embedding_dimension": len(embedding),
+                **quantize_embedding(embedding)
             }
             
             # Use upsert to update existing or create new
@@ -171,32 +215,49 @@ class ProjectEmbeddingManager:
             if project_type_filter:
                 query_filter["project_type"] = project_type_filter
             
-            # Get all projects matching the filter
-            projects = list(self.collection.find(query_filter))
+            # Get all projects matching the filter, reading the compact int8 codes
+            # instead of the full-precision embedding
+            projects = list(self.collection.find(query_filter, {"embedding": 0}))
             
             if not projects:
                 logger.info("📭 No projects found in database")
                 return []
             
-            # Calculate similarities
-            similarities = []
-            for project in projects:
-                # Calculate cosine similarity
-                similarity = self._cosine_similarity(query_embedding, project["embedding"])
-                
-                if similarity >= similarity_threshold:
-                    similarities.append({
-                        "project": project,
-                        "similarity": similarity,
-                        "project_name": project["project_name"],
-                        "folder_path": project["folder_path"],
-                        "project_type": project["project_type"],
-                        "created_at": project["created_at"]
-                    })
+            # Documents saved before quantization only have the float embedding
+            legacy_ids = [project["_id"] for project in projects if "embedding_i8" not in project]
+            if legacy_ids:
+                legacy = {
+                    doc["_id"]: doc.get("embedding", [])
+                    for doc in self.collection.find({"_id": {"$in": legacy_ids}}, {"embedding": 1})
+                }
+                for project in projects:
+                    if "embedding_i8" not in project:
+                        project["embedding"] = legacy.get(project["_id"], [])
             
-            # Sort by similarity (highest first) and limit results
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
-            return similarities[:limit]
+            # Score every project at once: one (N, dim) @ (dim,) product, divided by the norms
+            matrix = np.stack([dequantize_embedding(project) for project in projects])
+            query = np.asarray(query_embedding, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+            scores = (matrix @ query) / np.where(norms == 0, 1, norms)
+            
+            # Keep the matches above the threshold, then only fully sort the top `limit`
+            candidates = np.flatnonzero(scores >= similarity_threshold)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            
+            similarities = []
+            for i in candidates:
+                project = projects[i]
+                similarities.append({
+                    "project": project,
+                    "similarity": float(scores[i]),
+                    "project_name": project["project_name"],
+                    "folder_path": project["folder_path"],
+                    "project_type": project["project_type"],
+                    "created_at": project["created_at"]
+                })
+            return similarities
             
         except Exception as e:
             logger.error(f"❌ Error finding similar projects: {e}")
@@ -224,10 +285,15 @@ class ProjectEmbeddingManager:
             logger.error(f"❌ Error deleting project {project_name}: {e}")
             return False
     
-    def get_all_projects(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get all projects in the database"""
+    def get_all_projects(self,
+                         limit: Optional[int] = None,
+                         projection: Optional[Dict[str, Any]] = None,
+                         batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get all projects in the database, optionally fetching only the projected fields"""
         try:
-            cursor = self.collection.find({})
+            cursor = self.collection.find({}, projection)
+            if batch_size:
+                cursor = cursor.batch_size(batch_size)
             if limit:
                 cursor = cursor.limit(limit)
             return list(cursor)
@@ -235,6 +301,36 @@ class ProjectEmbeddingManager:
             logger.error(f"❌ Error getting all projects: {e}")
             return []
     
+    def search_projects(self,
+                        query: Optional[str] = None,
+                        project_type: Optional[str] = None,
+                        limit: int = 10) -> Dict[str, Any]:
+        """
+        Search projects by name/message substring and project type on the server
+        
+        Args:
+            query: Case-insensitive substring to look for in project name or messages
+            project_type: Optional exact project type to filter on
+            limit: Maximum number of projects to return
+            
+        Returns:
+            Dict with the total match count and up to `limit` projects (without embeddings)
+        """
+        query_filter: Dict[str, Any] = {}
+        if query:
+            pattern = {"$regex": re.escape(query), "$options": "i"}
+            query_filter["$or"] = [{"project_name": pattern}, {"messages": pattern}]
+        if project_type:
+            query_filter["project_type"] = project_type
+        
+        try:
+            total = self.collection.count_documents(query_filter)
+            projects = list(self.collection.find(query_filter, {"embedding": 0}).limit(limit))
+            return {"total": total, "projects": projects}
+        except Exception as e:
+            logger.error(f"❌ Error searching projects: {e}")
+            return {"total": 0, "projects": []}
+    
     def get_project_stats(self) -> Dict[str, Any]:
         """Get statistics about stored projects"""
         try:
@@ -268,23 +364,22 @@ class ProjectEmbeddingManager:
     
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
-        import numpy as np
-        from sklearn.metrics.pairwise import cosine_similarity
+        vec1_array = np.asarray(vec1, dtype=np.float32)
+        vec2_array = np.asarray(vec2, dtype=np.float32)
         
-        # Convert to numpy arrays and reshape for sklearn
-        vec1_array = np.array(vec1).reshape(1, -1)
-        vec2_array = np.array(vec2).reshape(1, -1)
-        
-        # Calculate cosine similarity
-        similarity = cosine_similarity(vec1_array, vec2_array)[0][0]
-        return float(similarity)
+        # Plain dot product over the norms; no (1, 1) matrix or re-normalized copies
+        norms = float(np.linalg.norm(vec1_array) * np.linalg.norm(vec2_array))
+        if norms == 0:
+            return 0.0
+        return float(vec1_array @ vec2_array) / norms
     
-    def migrate_from_json(self, json_file_path: str) -> int:
+    def migrate_from_json(self, json_file_path: str, batch_size: int = 1000) -> int:
         """
         Migrate existing JSON embeddings to MongoDB
         
         Args:
             json_file_path: Path to the existing project_embeddings.json file
+            batch_size: Number of projects sent to MongoDB per bulk write
             
         Returns:
             int: Number of projects migrated
@@ -294,38 +389,54 @@ class ProjectEmbeddingManager:
                 logger.warning(f"⚠️  JSON file not found: {json_file_path}")
                 return 0
             
-            with open(json_file_path, 'r') as f:
-                json_data = json.load(f)
-            
-            migrated_count = 0
+            with open(json_file_path, 'rb') as f:
+                json_data = json.loads(f.read())
             
+            # Build every upsert up front so the driver can send them in bulk
+            operations = []
+            project_names = []
+            now = datetime.utcnow()
             for project_name, project_data in json_data.items():
                 try:
-                    # Extract data from JSON format
-                    embedding = project_data.get("embedding", [])
+                    embedding = project_data.get("embedding")
+                    if embedding is None:
+                        encoded = project_data.get("embedding_f16")
+                        embedding = decode_embedding_f16(encoded).tolist() if encoded else []
                     messages = project_data.get("messages", [])
                     folder = project_data.get("folder", "")
                     
-                    # Determine project type from folder path or messages
-                    project_type = self._infer_project_type(folder, messages)
-                    
-                    # Save to MongoDB
-                    success = self.save_project_embedding(
-                        project_name=project_name,
-                        folder_path=folder,
-                        messages=messages,
-                        embedding=embedding,
-                        project_type=project_type,
-                        metadata={"migrated_from_json": True}
-                    )
-                    
-                    if success:
-                        migrated_count += 1
+                    document = {
+                        "project_name": project_name,
+                        "folder_path": folder,
+                        "messages": messages,
+                        "embedding": embedding,
+                        "project_type": self._infer_project_type(folder, messages),
+                        "metadata": {"migrated_from_json": True},
+                        "created_at": now,
+                        "updated_at": now,
+                        "embedding_dimension": len(embedding),
+                        **quantize_embedding(embedding)
+                    }
+                    operations.append(ReplaceOne({"project_name": project_name}, document, upsert=True))
+                    project_names.append(project_name)
                         
                 except Exception as e:
                     logger.error(f"❌ Error migrating project {project_name}: {e}")
                     continue
             
+            migrated_count = 0
+            for start in range(0, len(operations), batch_size):
+                batch = operations[start:start + batch_size]
+                try:
+                    result = self.collection.bulk_write(batch, ordered=False)
+                    migrated_count += result.upserted_count + result.modified_count
+                except BulkWriteError as e:
+                    details = e.details
+                    migrated_count += details.get("nUpserted", 0) + details.get("nModified", 0)
+                    for error in details.get("writeErrors", []):
+                        failed = project_names[start + error["index"]]
+                        logger.error(f"❌ Error migrating project {failed}: {error.get('errmsg')}")
+            
             logger.info(f"✅ Migrated {migrated_count} projects from JSON to MongoDB")
             return migrated_count
             
@@ -335,19 +446,7 @@ class ProjectEmbeddingManager:
     
     def _infer_project_type(self, folder_path: str, messages: List[str]) -> str:
         """Infer project type from folder path and messages"""
-        folder_lower = folder_path.lower()
-        messages_text = " ".join(messages).lower()
-        
-        if any(keyword in folder_lower or keyword in messages_text for keyword in ["game", "pygame", "flappy", "tic-tac-toe"]):
-            return "game"
-        elif any(keyword in folder_lower or keyword in messages_text for keyword in ["web", "flask", "app", "website", "api"]):
-            return "web_app"
-        elif any(keyword in folder_lower or keyword in messages_text for keyword in ["script", "automation", "tool"]):
-            return "script"
-        elif any(keyword in folder_lower or keyword in messages_text for keyword in ["research", "analysis", "report"]):
-            return "research"
-        else:
-            return "unknown"
+        return infer_project_type(folder_path, messages)
 
 # Global instance for easy access
 _mongodb_config = None
@@ -1,9 +1,12 @@
 import os
 import json
-from sentence_transformers import SentenceTransformer
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from tools.mongodb_config import get_embedding_manager, get_mongodb_config
+from tools.mongodb_config import (
+    get_embedding_manager, get_mongodb_config, infer_project_type,
+    encode_embedding_f16, decode_embedding_f16
+)
 import logging
 
 # Configure logging
@@ -13,48 +16,92 @@ logger = logging.getLogger(__name__)
 MODEL_NAME = "all-MiniLM-L6-v2"
 SIMILARITY_THRESHOLD = 0.2
 
-model = SentenceTransformer(MODEL_NAME)
+@functools.cache
+def _get_model():
+    """Load the sentence transformer on first use instead of at import"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
 
-def load_codebase(project_folder):
+# Stacked (N, dim) embedding matrix for the JSON fallback, rebuilt when the file changes
+_embedding_matrix_cache = {"key": None, "names": [], "folders": [], "matrix": None}
+
+# Float32 copy of the JSON fallback's embeddings, plus the names and the JSON file
+# stamp it was built from, so other processes can memory-map it instead of re-parsing
+EMBEDDINGS_SHARD_PATH = os.path.join("json", "project_embeddings.npy")
+EMBEDDINGS_NAMES_PATH = os.path.join("json", "project_embeddings_names.json")
+
+# Common file extensions to include
+CODE_EXTENSIONS = frozenset({'.py', '.js', '.ts', '.jsx', '.tsx', '.html', '.css', '.scss', '.json', '.yaml', '.yml', '.md', '.txt'})
+
+# Important config files included regardless of extension
+CONFIG_FILES = frozenset({'requirements.txt', 'package.json', 'Dockerfile', 'docker-compose.yml'})
+
+# Files larger than this are left out of the codebase
+MAX_CODEBASE_FILE_SIZE = 512 * 1024
+
+# Directories to skip
+SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', 'venv', '.venv', 'env', '.env', 'dist', 'build', '.pytest_cache'})
+
+def _walk_code_files(folder):
+    """Yield paths of code and config files under `folder`, pruning SKIP_DIRS"""
+    # scandir reports the entry type from the directory listing, so no stat per file
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in SKIP_DIRS:
+                yield from _walk_code_files(entry.path)
+        elif entry.is_file() and (os.path.splitext(entry.name)[1] in CODE_EXTENSIONS or entry.name in CONFIG_FILES):
+            yield entry.path
+
+def _read_code_file(project_folder, rel_path, max_file_size=MAX_CODEBASE_FILE_SIZE):
+    """Read one file for load_codebase, or None if it is too large or unreadable"""
+    file_path = os.path.join(project_folder, rel_path)
+    try:
+        # Lock files and data dumps are skipped before they are ever read
+        if os.stat(file_path).st_size > max_file_size:
+            print(f"Warning: Skipping {rel_path} (larger than {max_file_size} bytes)")
+            return None
+        with open(file_path, 'rb', buffering=1 << 20) as f:
+            return f.read().decode('utf-8', errors='replace')
+    except Exception as e:
+        print(f"Warning: Could not read {rel_path}: {e}")
+        return None
+
+def load_codebase(project_folder, max_file_size=MAX_CODEBASE_FILE_SIZE):
     """Load existing codebase from a project folder for LLM input"""
     codebase = {}
     
     if not os.path.exists(project_folder):
         return codebase
     
-    # Common file extensions to include
-    code_extensions = {'.py', '.js', '.ts', '.jsx', '.tsx', '.html', '.css', '.scss', '.json', '.yaml', '.yml', '.md', '.txt'}
-    
-    # Directories to skip
-    skip_dirs = {'.git', '__pycache__', 'node_modules', 'venv', '.venv', 'env', '.env', 'dist', 'build', '.pytest_cache'}
-    
-    for root, dirs, files in os.walk(project_folder):
-        # Skip unwanted directories
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-        
-        for file in files:
-            file_path = os.path.join(root, file)
-            rel_path = os.path.relpath(file_path, project_folder)
-            
-            # Only include code files and important config files
-            if any(file.endswith(ext) for ext in code_extensions) or file in {'requirements.txt', 'package.json', 'Dockerfile', 'docker-compose.yml'}:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    codebase[rel_path] = content
-                except Exception as e:
-                    print(f"Warning: Could not read {rel_path}: {e}")
+    # Walk first, then overlap the reads; the GIL is released while a thread waits on I/O
+    rel_paths = [os.path.relpath(file_path, project_folder) for file_path in _walk_code_files(project_folder)]
+    read_file = functools.partial(_read_code_file, project_folder, max_file_size=max_file_size)
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        for rel_path, content in zip(rel_paths, executor.map(read_file, rel_paths)):
+            if content is not None:
+                codebase[rel_path] = content
     
     return codebase
 
+@functools.lru_cache(maxsize=4096)
+def _encode_cached(text):
+    """Encode one joined text, memoized so repeated messages skip the model"""
+    return tuple(_get_model().encode([text], normalize_embeddings=True)[0].tolist())
+
 def compute_embedding(messages):
     """Compute embedding for messages using the sentence transformer model"""
     if isinstance(messages, str):
         messages = [messages]
-    return model.encode([" ".join(messages)], normalize_embeddings=True)[0].tolist()
+    return list(_encode_cached(" ".join(messages)))
 
 def save_project_embedding(folder, messages):
     """Save project embedding to MongoDB"""
+    embedding = None
     try:
         folder_name = os.path.basename(os.path.normpath(folder))
         
@@ -89,48 +136,43 @@ def save_project_embedding(folder, messages):
     except Exception as e:
         logger.error(f"❌ Error saving project embedding: {e}")
         # Fallback to JSON if MongoDB fails
-        _save_to_json_fallback(folder, messages)
+        _save_to_json_fallback(folder, messages, embedding=embedding)
 
 def _infer_project_type(folder_path, messages):
     """Infer project type from folder path and messages"""
-    folder_lower = folder_path.lower()
-    messages_text = " ".join(messages).lower()
-    
-    if any(keyword in folder_lower or keyword in messages_text for keyword in ["game", "pygame", "flappy", "tic-tac-toe"]):
-        return "game"
-    elif any(keyword in folder_lower or keyword in messages_text for keyword in ["web", "flask", "app", "website", "api"]):
-        return "web_app"
-    elif any(keyword in folder_lower or keyword in messages_text for keyword in ["script", "automation", "tool"]):
-        return "script"
-    elif any(keyword in folder_lower or keyword in messages_text for keyword in ["research", "analysis", "report"]):
-        return "research"
-    else:
-        return "unknown"
+    return infer_project_type(folder_path, messages)
 
-def _save_to_json_fallback(folder, messages):
+def _save_to_json_fallback(folder, messages, embedding=None):
     """Fallback to JSON storage if MongoDB fails"""
     try:
         folder_name = os.path.basename(os.path.normpath(folder))
         embeddings_path = os.path.join("json", "project_embeddings.json")
         
-        if os.path.exists(embeddings_path):
-            with open(embeddings_path, "r") as f:
-                data = json.load(f)
-        else:
-            data = {}
+        data = _read_json_store()
         
         # Compute embedding
-        embedding = compute_embedding(messages)
+        if embedding is None:
+            embedding = compute_embedding(messages)
         
         # Update or create the project entry
         data[folder_name] = {
-            "embedding": embedding,
+            "embedding_f16": encode_embedding_f16(embedding),
             "messages": messages,
             "folder": folder
         }
         
-        with open(embeddings_path, "w") as f:
-            json.dump(data, f, indent=2)
+        # Promote entries still stored as float lists to the compact encoding
+        for entry in data.values():
+            if "embedding" in entry:
+                entry["embedding_f16"] = encode_embedding_f16(entry.pop("embedding"))
+        
+        # Compact separators: the float arrays dominate this file, so no indentation
+        with open(embeddings_path, "wb") as f:
+            f.write(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        try:
+            _write_embedding_shard(data)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not write embedding shard: {e}")
             
         logger.info(f"✅ Fallback: Saved to JSON for project: {folder_name}")
         
@@ -141,7 +183,10 @@ def load_all_project_embeddings():
     """Load all project embeddings from MongoDB (fallback to JSON if needed)"""
     try:
         embedding_manager = get_embedding_manager()
-        projects = embedding_manager.get_all_projects()
+        projects = embedding_manager.get_all_projects(
+            projection={"_id": 0, "project_name": 1, "embedding": 1, "messages": 1, "folder_path": 1},
+            batch_size=500
+        )
         
         # Convert to the old format for backward compatibility
         result = {}
@@ -155,15 +200,40 @@ def load_all_project_embeddings():
         
     except Exception as e:
         logger.warning(f"⚠️  MongoDB failed, falling back to JSON: {e}")
-        # Fallback to JSON
-        embeddings_path = os.path.join("json", "project_embeddings.json")
-        if os.path.exists(embeddings_path):
-            with open(embeddings_path, "r") as f:
-                return json.load(f)
-        return {}
+        return _load_from_json_only()
+
+def _read_json_store():
+    """Read project_embeddings.json as stored, or {} if it doesn't exist"""
+    embeddings_path = os.path.join("json", "project_embeddings.json")
+    if os.path.exists(embeddings_path):
+        with open(embeddings_path, "rb") as f:
+            return json.loads(f.read())
+    return {}
+
+def _entry_embedding(entry):
+    """Float32 embedding of a JSON store entry, in either the float16 or legacy list format"""
+    encoded = entry.get("embedding_f16")
+    if encoded is not None:
+        return decode_embedding_f16(encoded)
+    return np.asarray(entry.get("embedding", []), dtype=np.float32)
+
+def _load_from_json_only():
+    """Load all project embeddings from the JSON fallback store"""
+    data = _read_json_store()
+    # Callers expect the embedding as a list, whichever format it was stored in
+    for entry in data.values():
+        if "embedding" not in entry:
+            entry["embedding"] = _entry_embedding(entry).tolist()
+    return data
 
 def find_closest_project(messages):
     """Find the closest project using MongoDB with fallback to JSON"""
+    # Nothing to embed, so nothing to match; don't load the model for it
+    if not any(messages):
+        logger.info("📭 No messages to match against")
+        return None, 0.0
+    
+    query_embedding = None
     try:
         # Try MongoDB first
         embedding_manager = get_embedding_manager()
@@ -186,30 +256,98 @@ def find_closest_project(messages):
             
     except Exception as e:
         logger.warning(f"⚠️  MongoDB search failed, falling back to JSON: {e}")
-        # Fallback to JSON-based search
-        return _find_closest_project_json_fallback(messages)
+        # Fallback to JSON-based search, reusing the embedding if it was already computed
+        return _find_closest_project_json_fallback(messages, query_embedding=query_embedding)
+
+def _embeddings_file_stamp():
+    """(mtime_ns, size) of project_embeddings.json, or None if it is missing"""
+    try:
+        st = os.stat(os.path.join("json", "project_embeddings.json"))
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def _write_embedding_shard(data):
+    """Write the embeddings in `data` as a float32 .npy next to project_embeddings.json"""
+    names = list(data)
+    matrix = np.asarray([_entry_embedding(data[name]) for name in names], dtype=np.float32)
 
-def _find_closest_project_json_fallback(messages):
+    tmp_path = EMBEDDINGS_SHARD_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, EMBEDDINGS_SHARD_PATH)
+
+    # Written last: the shard only counts once its names carry the current JSON stamp
+    meta = {
+        "source": _embeddings_file_stamp(),
+        "names": names,
+        "folders": [data[name]["folder"] for name in names]
+    }
+    tmp_path = EMBEDDINGS_NAMES_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, EMBEDDINGS_NAMES_PATH)
+
+def _load_embedding_shard(stamp):
+    """Memory-map the .npy shard if it was built from the JSON file with this stamp"""
+    try:
+        with open(EMBEDDINGS_NAMES_PATH, "rb") as f:
+            meta = json.loads(f.read())
+        if meta.get("source") != stamp:
+            return None
+        names, folders = meta["names"], meta["folders"]
+        matrix = np.load(EMBEDDINGS_SHARD_PATH, mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+    if matrix.shape[0] != len(names):
+        return None
+    return names, folders, matrix
+
+def _embedding_matrix():
+    """Return names, folders and the stacked float32 embeddings of the JSON store"""
+    stamp = _embeddings_file_stamp()
+    if stamp is None:
+        return [], [], None
+    key = tuple(stamp)
+    if _embedding_matrix_cache["key"] == key:
+        return _embedding_matrix_cache["names"], _embedding_matrix_cache["folders"], _embedding_matrix_cache["matrix"]
+
+    # Reuse the on-disk shard when it matches; otherwise parse the JSON and convert once
+    shard = _load_embedding_shard(stamp)
+    if shard is not None:
+        names, folders, matrix = shard
+    else:
+        data = _read_json_store()
+        names = list(data)
+        folders = [data[name]["folder"] for name in names]
+        matrix = np.asarray([_entry_embedding(data[name]) for name in names], dtype=np.float32)
+    _embedding_matrix_cache.update(key=key, names=names, folders=folders, matrix=matrix)
+    return names, folders, matrix
+
+def _find_closest_project_json_fallback(messages, query_embedding=None):
     """Fallback method using JSON file for finding closest project"""
     try:
-        new_emb = np.array(compute_embedding(messages)).reshape(1, -1)
-        all_projects = load_all_project_embeddings()
+        # MongoDB already failed to answer, so go straight to the JSON store
+        names, folders, matrix = _embedding_matrix()
         
-        if not all_projects:
+        if not names:
             logger.info("📭 No projects found in JSON fallback")
             return None, 0.0
             
-        best_project = None
-        best_score = -1
-        
-        logger.info("[DEBUG] Embedding similarity scores (JSON fallback):")
-        for name, info in all_projects.items():
-            emb = np.array(info["embedding"]).reshape(1, -1)
-            score = cosine_similarity(new_emb, emb)[0][0]
-            logger.info(f"  - {name}: {score:.4f}")
-            if score > best_score:
-                best_score = score
-                best_project = (name, info["folder"])
+        # Embeddings are L2-normalized, so one matrix-vector product gives every cosine score
+        if query_embedding is None:
+            query_embedding = compute_embedding(messages)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        scores = matrix @ query
+        best = int(scores.argmax())
+        best_score = float(scores[best])
+        best_project = (names[best], folders[best])
+        
+        # Per-project scores are debug detail: only format them if someone will see them
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Embedding similarity scores (JSON fallback):\n" + "\n".join(
+                f"  - {name}: {score:.4f}" for name, score in zip(names, scores)
+            ))
                 
         if best_score >= SIMILARITY_THRESHOLD:
             logger.info(f"✅ Found similar project via JSON: {best_project[0]} (similarity: {best_score:.4f})")
@@ -232,6 +370,10 @@ def main():
         print("Warning: json/messages.json not found.")
         return None, 0.0
     
+    if not any(messages):
+        print("📭 No messages to match, skipping project lookup")
+        return None, 0.0
+    
     print(f"🔍 Looking for similar projects for: {messages}")
     closest_project, similarity = find_closest_project(messages)
     
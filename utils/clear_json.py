@@ -7,6 +7,28 @@ This is useful for starting fresh sessions or cleaning up after testing.
 import os
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Files reset by clear_json_files, with the content each one starts from
+CLEAR_TARGETS = (
+    ("json/messages.json", b"{}"),
+    ("json/phased_tasks.json", b"[]"),
+    ("json/last_processed_ts.txt", b""),
+    ("json/last_task_processed_ts.txt", b""),
+    ("json/task_dependencies.json", b"{}"),
+    ("json/dependency_matrix.json", b"{}"),
+)
+
+def _truncate_write(target):
+    """Truncate a file and write its default content with a single write call"""
+    path, content = target
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if content:
+            os.write(fd, content)
+    finally:
+        os.close(fd)
+    return path
 
 def clear_json_files():
     """Clear all files in json/ folder to their default states"""
@@ -14,35 +36,10 @@ def clear_json_files():
         # Ensure json directory exists
         os.makedirs("json", exist_ok=True)
         
-        # Clear messages.json (empty object)
-        with open("json/messages.json", "w") as f:
-            f.write("{}")
-        print("✅ Cleared messages.json")
-        
-        # Clear phased_tasks.json (empty array)
-        with open("json/phased_tasks.json", "w") as f:
-            f.write("[]")
-        print("✅ Cleared phased_tasks.json")
-        
-        # Clear last_processed_ts.txt (empty string)
-        with open("json/last_processed_ts.txt", "w") as f:
-            f.write("")
-        print("✅ Cleared last_processed_ts.txt")
-        
-        # Clear last_task_processed_ts.txt (empty string)
-        with open("json/last_task_processed_ts.txt", "w") as f:
-            f.write("")
-        print("✅ Cleared last_task_processed_ts.txt")
-        
-        # Clear task_dependencies.json (empty object)
-        with open("json/task_dependencies.json", "w") as f:
-            f.write("{}")
-        print("✅ Cleared task_dependencies.json")
-        
-        # Clear dependency_matrix.json (empty object)
-        with open("json/dependency_matrix.json", "w") as f:
-            f.write("{}")
-        print("✅ Cleared dependency_matrix.json")
+        # The files are independent, so reset them concurrently; map() keeps the order
+        with ThreadPoolExecutor(max_workers=len(CLEAR_TARGETS)) as executor:
+            for path in executor.map(_truncate_write, CLEAR_TARGETS):
+                print(f"✅ Cleared {os.path.basename(path)}")
         
         # Clean up project_embeddings.json to only include existing projects
         cleanup_project_embeddings()
@@ -54,7 +51,7 @@ def clear_json_files():
         print(f"❌ Error clearing json/ files: {e}")
         return False
 
-def cleanup_project_embeddings():
+def cleanup_project_embeddings(verbose=False):
     """Remove embeddings for projects that no longer exist in Work/ directory"""
     try:
         work_dir = os.path.expanduser("~/Desktop/Work")
@@ -68,43 +65,40 @@ def cleanup_project_embeddings():
             return
         
         # Get list of existing project folders
-        existing_projects = set()
-        if os.path.exists(work_dir):
-            for item in os.listdir(work_dir):
-                item_path = os.path.join(work_dir, item)
-                if os.path.isdir(item_path):
-                    existing_projects.add(item)
+        # DirEntry knows the type from the listing, so only symlinks cost a stat
+        with os.scandir(work_dir) as it:
+            existing_projects = {entry.name for entry in it if entry.is_dir()}
         
         print(f"📁 Found {len(existing_projects)} existing projects in Work/ directory")
         
         # Load current embeddings
         if os.path.exists("json/project_embeddings.json"):
-            with open("json/project_embeddings.json", "r") as f:
-                embeddings_data = json.load(f)
+            with open("json/project_embeddings.json", "rb") as f:
+                embeddings_data = json.loads(f.read())
         else:
             embeddings_data = {}
         
         # Filter embeddings to only include existing projects
         original_count = len(embeddings_data)
-        cleaned_embeddings = {}
+        # The set difference runs in C; only the (usually few) stale names are touched
+        # in Python, and deleting them in place keeps the remaining entries in order
+        removed_projects = embeddings_data.keys() - existing_projects
+        cleaned_embeddings = embeddings_data
+        for project_name in removed_projects:
+            del cleaned_embeddings[project_name]
         
-        for project_name, project_data in embeddings_data.items():
-            if project_name in existing_projects:
-                cleaned_embeddings[project_name] = project_data
-            else:
-                print(f"🗑️  Removing embedding for non-existent project: {project_name}")
-        
-        # Save cleaned embeddings
-        with open("json/project_embeddings.json", "w") as f:
-            json.dump(cleaned_embeddings, f, indent=2)
+        if verbose and removed_projects:
+            print(f"🗑️  Removing embeddings for non-existent projects: {', '.join(sorted(removed_projects))}")
         
+        # Save cleaned embeddings, only if something was actually removed
         removed_count = original_count - len(cleaned_embeddings)
         if removed_count > 0:
+            with open("json/project_embeddings.json", "wb") as f:
+                f.write(json.dumps(cleaned_embeddings, separators=(",", ":")).encode("utf-8"))
             print(f"🧹 Cleaned up {removed_count} embeddings for non-existent projects")
+            print("✅ Updated project_embeddings.json")
         else:
             print("✅ All project embeddings are valid")
-        
-        print("✅ Updated project_embeddings.json")
             
     except Exception as e:
         print(f"⚠️  Warning: Could not cleanup project embeddings: {e}")
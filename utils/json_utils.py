@@ -6,6 +6,29 @@ This module provides functions to clear and manage JSON files consistently.
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Default contents written by clear_json_files, encoded once
+EMPTY_OBJ = b"{}"
+EMPTY_LIST = b"[]"
+EMPTY_STR = b""
+EMPTY_MEDIA = json.dumps({
+    "research_topics": {},
+    "summary": {
+        "total_research_topics": 0,
+        "total_media_resources": 0,
+        "last_updated": ""
+    }
+}, indent=2).encode("utf-8")
+
+def _write_bytes(path, payload):
+    """Replace a small file's content with one write, skipping the buffered IO layers"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if payload:
+            os.write(fd, payload)
+    finally:
+        os.close(fd)
 
 def clear_json_files():
     """Clear all .json and .txt files in json/ folder to their default states"""
@@ -13,46 +36,36 @@ def clear_json_files():
         # Ensure json directory exists
         os.makedirs("json", exist_ok=True)
         
-        # List all .json and .txt files in the json/ directory
-        for filename in os.listdir("json"):
-            filepath = os.path.join("json", filename)
-            if not os.path.isfile(filepath):
-                continue
+        # List all .json and .txt files in the json/ directory; scandir gives the
+        # entry type from the listing itself, so there is no stat per file
+        with os.scandir("json") as it:
+            entries = [entry for entry in it if entry.is_file()]
+        for entry in entries:
+            filename = entry.name
             if filename == "media.json":
                 # Reset media.json to default structure
-                empty_media = {
-                    "research_topics": {},
-                    "summary": {
-                        "total_research_topics": 0,
-                        "total_media_resources": 0,
-                        "last_updated": ""
-                    }
-                }
-                with open(filepath, "w") as f:
-                    json.dump(empty_media, f, indent=2)
-            elif filename == "project_embeddings.json":
-                # Clear project_embeddings.json to empty object
-                with open(filepath, "w") as f:
-                    f.write("{}")
+                payload = EMPTY_MEDIA
             elif filename.endswith(".json"):
-                # Clear all other .json files to empty object
-                with open(filepath, "w") as f:
-                    f.write("{}")
+                # Clear project_embeddings.json and all other .json files to empty object
+                payload = EMPTY_OBJ
             elif filename.endswith(".txt"):
                 # Clear all .txt files to empty string
-                with open(filepath, "w") as f:
-                    f.write("")
+                payload = EMPTY_STR
+            else:
+                continue
+            _write_bytes(entry.path, payload)
         # Remove session marker if exists
-        session_marker = os.path.join("json", "session_active.txt")
-        if os.path.exists(session_marker):
-            os.remove(session_marker)
+        try:
+            os.remove(os.path.join("json", "session_active.txt"))
+        except FileNotFoundError:
+            pass
         print("🧹 Cleared all json/ files to default states")
         return True
     except Exception as e:
         print(f"❌ Error clearing json/ files: {e}")
         return False
 
-def cleanup_project_embeddings():
+def cleanup_project_embeddings(verbose=False):
     """Remove embeddings for projects that no longer exist in Work/ directory"""
     try:
         work_dir = os.path.expanduser("~/Desktop/Work")
@@ -68,12 +81,10 @@ def cleanup_project_embeddings():
             return
         
         # Get list of existing project folders
-        existing_projects = set()
         try:
-            for item in os.listdir(work_dir):
-                item_path = os.path.join(work_dir, item)
-                if os.path.isdir(item_path):
-                    existing_projects.add(item)
+            # DirEntry knows the type from the listing, so only symlinks cost a stat
+            with os.scandir(work_dir) as it:
+                existing_projects = {entry.name for entry in it if entry.is_dir()}
         except (OSError, PermissionError) as e:
             print(f"⚠️  Could not read Work directory: {e}")
             # If we can't read the directory, clear all embeddings
@@ -99,8 +110,8 @@ def cleanup_project_embeddings():
         # Load current embeddings
         if os.path.exists("json/project_embeddings.json"):
             try:
-                with open("json/project_embeddings.json", "r") as f:
-                    embeddings_data = json.load(f)
+                with open("json/project_embeddings.json", "rb") as f:
+                    embeddings_data = json.loads(f.read())
             except (json.JSONDecodeError, FileNotFoundError):
                 embeddings_data = {}
         else:
@@ -108,20 +119,21 @@ def cleanup_project_embeddings():
         
         # Filter embeddings to only include existing projects
         original_count = len(embeddings_data)
-        cleaned_embeddings = {}
+        # The set difference runs in C; only the (usually few) stale names are touched
+        # in Python, and deleting them in place keeps the remaining entries in order
+        removed_projects = embeddings_data.keys() - existing_projects
+        cleaned_embeddings = embeddings_data
+        for project_name in removed_projects:
+            del cleaned_embeddings[project_name]
         
-        for project_name, project_data in embeddings_data.items():
-            if project_name in existing_projects:
-                cleaned_embeddings[project_name] = project_data
-            else:
-                print(f"🗑️  Removing embedding for non-existent project: {project_name}")
-        
-        # Save cleaned embeddings
-        with open("json/project_embeddings.json", "w") as f:
-            json.dump(cleaned_embeddings, f, indent=2)
+        if verbose and removed_projects:
+            print(f"🗑️  Removing embeddings for non-existent projects: {', '.join(sorted(removed_projects))}")
         
+        # Save cleaned embeddings, only if something was actually removed
         removed_count = original_count - len(cleaned_embeddings)
         if removed_count > 0:
+            with open("json/project_embeddings.json", "wb") as f:
+                f.write(json.dumps(cleaned_embeddings, separators=(",", ":")).encode("utf-8"))
             print(f"🧹 Cleaned up {removed_count} embeddings for non-existent projects")
         else:
             print("✅ All project embeddings are valid")
@@ -135,49 +147,56 @@ def cleanup_project_embeddings():
         except:
             pass
 
+# Files reported by get_json_file_status, in display order
+JSON_STATUS_FILES = (
+    "messages.json",
+    "phased_tasks.json",
+    "last_processed_ts.txt",
+    "last_task_processed_ts.txt",
+    "task_dependencies.json",
+    "dependency_matrix.json",
+    "project_embeddings.json",
+    "media.json",
+    "session_active.txt",
+)
+
+def _file_status(entry):
+    """Describe one json/ file for get_json_file_status"""
+    try:
+        if entry.name.endswith('.json'):
+            # Try to parse as JSON, straight from the file
+            try:
+                with open(entry.path, "rb") as f:
+                    data = json.load(f)
+            except ValueError:
+                return f"Invalid JSON ({entry.stat().st_size} bytes)"
+            if isinstance(data, dict):
+                return f"Object with {len(data)} keys"
+            elif isinstance(data, list):
+                return f"Array with {len(data)} items"
+            else:
+                return f"JSON data: {type(data).__name__}"
+        else:
+            # Text file: the size is all we report, so don't read it
+            return f"Text file ({entry.stat().st_size} bytes)"
+    except Exception as e:
+        return f"Error reading: {e}"
+
 def get_json_file_status():
     """Get the current status of all JSON files"""
-    status = {}
-    
-    json_files = [
-        "messages.json",
-        "phased_tasks.json", 
-        "last_processed_ts.txt",
-        "last_task_processed_ts.txt",
-        "task_dependencies.json",
-        "dependency_matrix.json",
-        "project_embeddings.json",
-        "media.json",
-        "session_active.txt"
-    ]
+    # One directory listing instead of an exists() check per file
+    try:
+        with os.scandir("json") as it:
+            entries = {entry.name: entry for entry in it}
+    except OSError:
+        entries = {}
     
-    for filename in json_files:
-        filepath = os.path.join("json", filename)
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, "r") as f:
-                    content = f.read().strip()
-                    if filename.endswith('.json'):
-                        # Try to parse as JSON
-                        try:
-                            data = json.loads(content)
-                            if isinstance(data, dict):
-                                status[filename] = f"Object with {len(data)} keys"
-                            elif isinstance(data, list):
-                                status[filename] = f"Array with {len(data)} items"
-                            else:
-                                status[filename] = f"JSON data: {type(data).__name__}"
-                        except json.JSONDecodeError:
-                            status[filename] = f"Invalid JSON ({len(content)} chars)"
-                    else:
-                        # Text file
-                        status[filename] = f"Text file ({len(content)} chars)"
-            except Exception as e:
-                status[filename] = f"Error reading: {e}"
-        else:
-            status[filename] = "File not found"
+    # Independent files: overlap their reads, then report in JSON_STATUS_FILES order
+    present = [entries[filename] for filename in JSON_STATUS_FILES if filename in entries]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        found = dict(zip((entry.name for entry in present), executor.map(_file_status, present)))
     
-    return status
+    return {filename: found.get(filename, "File not found") for filename in JSON_STATUS_FILES}
 
 def print_json_status():
     """Print the current status of all JSON files"""
@@ -200,10 +219,8 @@ def clear_task_json_files():
             "writing_tasks.json"
         ]
         for filename in task_files:
-            filepath = os.path.join("json", filename)
-            with open(filepath, "w") as f:
-                json.dump([], f, indent=2)
-            print(f"✅ Cleared {filename}")
+            _write_bytes(os.path.join("json", filename), EMPTY_LIST)
+        print(f"✅ Cleared {', '.join(task_files)}")
         return True
     except Exception as e:
         print(f"❌ Error clearing task json files: {e}")
@@ -1,5 +1,7 @@
 # prompts.py
 
+import string
+
 def extract_tasks_prompt(messages):
     joined = "\n".join(f"- {msg}" for msg in messages)
     
@@ -90,52 +92,12 @@ Before returning, verify that:
 - The file will still run and work as before
 - New features are properly integrated"""
 
-def execute_tasks_prompt(sorted_tasks, codebase=None, existing_project_folder=None):
-    # Separate selected and rejected tasks
-    selected_tasks = [t for t in sorted_tasks if t.get('selectionStatus') == 'selected']
-    rejected_tasks = [t for t in sorted_tasks if t.get('selectionStatus') == 'rejected']
-    
-    task_list = "\n".join(f"- ({t['phase']}) {t['task']}" for t in selected_tasks)
-    
-    # Add rejected tasks as comments
-    rejected_section = ""
-    if rejected_tasks:
-        rejected_list = "\n".join(f"# REJECTED: {t['task']}" for t in rejected_tasks)
-        rejected_section = f"""
-
-**REJECTED TASKS (DO NOT IMPLEMENT THESE):**
-{rejected_list}
-
-**CRITICAL: DO NOT IMPLEMENT REJECTED FEATURES**
-- The above rejected tasks must NOT be implemented
-- Do not add any code related to these rejected features
-- Even if a rejected feature seems "logical" or "necessary", do not include it
-- If a selected task depends on a rejected task, implement only the parts that don't require the rejected feature
-- If you cannot implement a selected task without a rejected dependency, skip that task and add a comment explaining why
-"""
-    
-    codebase_section = ""
-    if codebase:
-        codebase_section = "\n\nEXISTING FILES AND CONTENTS (DO NOT REMOVE ANY OF THIS LOGIC):\n"
-        for path, content in codebase.items():
-            codebase_section += f"\n--- {path} ---\n{content}\n"
-    
-    # Add existing project folder info if provided
-    existing_project_section = ""
-    if existing_project_folder:
-        existing_project_section = f"""
-**EXISTING PROJECT FOLDER:**
-- Use the existing project folder: {existing_project_folder}
-- Do NOT create a new project folder
-- Modify existing files in this folder instead of creating new ones
-- If the folder doesn't exist, create it
-"""
-    
-    return f"""Write a Python script that executes these SELECTED tasks in order:
+# Parsed once at import; execute_tasks_prompt only substitutes the $-placeholders
+_EXECUTE_TASKS_TEMPLATE = string.Template("""Write a Python script that executes these SELECTED tasks in order:
 
-{task_list}
+$task_list
 
-{existing_project_section}
+$existing_project_section
 
 **CRITICAL FEATURE CONSTRAINT:**
 - ONLY implement the features explicitly listed in the selected tasks above
@@ -143,7 +105,7 @@ def execute_tasks_prompt(sorted_tasks, codebase=None, existing_project_folder=No
 - Do NOT add "logical" or "necessary" features that weren't explicitly selected
 - If a feature seems like it should be included but wasn't selected, do NOT include it
 
-{rejected_section}
+$rejected_section
 
 **ABSOLUTELY CRITICAL CODE PRESERVATION REQUIREMENTS:**
 - **NEVER MODIFY EXISTING FUNCTIONALITY** - Only ADD new features
@@ -229,12 +191,16 @@ def execute_tasks_prompt(sorted_tasks, codebase=None, existing_project_folder=No
 - Return ONLY the Python code, no explanations or markdown
 
 **CRITICAL VIRTUAL ENVIRONMENT REQUIREMENTS:**
+- Create the virtual environment in-process with venv.EnvBuilder (import venv), NOT by running `sys.executable -m venv` in a subprocess
+- Example: venv.EnvBuilder(with_pip=True, symlinks=(os.name != 'nt')).create(venv_path)
 - ALWAYS use the virtual environment's pip for installing dependencies
 - NEVER use sys.executable for pip install commands
 - Use the correct pip path: venv_path + "/bin/pip" (Unix/Mac) or venv_path + "/Scripts/pip" (Windows)
-- Example: subprocess.run([os.path.join(venv_path, "bin", "pip"), "install", "flask"], check=True)
+- Install ALL dependencies with ONE pip invocation: collect them in a `deps` list and call pip once
+- Pass --disable-pip-version-check --no-input -q to every pip call (no PyPI self-update check, no progress bar)
+- Example: subprocess.run([os.path.join(venv_path, "bin", "pip"), "install", "--disable-pip-version-check", "--no-input", "-q", *deps], check=True)
 - If you encounter a pip error about "externally-managed-environment" or PEP 668, add the '--break-system-packages' flag to the pip install command.
-- Example: subprocess.run([pip_path, "install", "--break-system-packages", "flask"], check=True)
+- Example: subprocess.run([pip_path, "install", *pip_flags, "--break-system-packages", *deps], check=True)
 
 **CRITICAL ERROR HANDLING REQUIREMENTS:**
 - If a subprocess call fails, print the error and exit.
@@ -246,29 +212,32 @@ def execute_tasks_prompt(sorted_tasks, codebase=None, existing_project_folder=No
 import os
 import subprocess
 import sys
+import venv
 
 # Project setup
 project_name = "..."
-project_folder = os.path.expanduser(f"~/Desktop/Work/{{project_name}}")
+project_folder = os.path.expanduser(f"~/Desktop/Work/{project_name}")
 
 # Create project directory
 os.makedirs(project_folder, exist_ok=True)
 
-# Create virtual environment
+# Create virtual environment (pyvenv.cfg only exists once the venv is complete)
 venv_path = os.path.join(project_folder, "venv")
-if not os.path.exists(venv_path):
-    subprocess.run([sys.executable, "-m", "venv", venv_path], check=True)
+if not os.path.isfile(os.path.join(venv_path, "pyvenv.cfg")):
+    venv.EnvBuilder(with_pip=True, symlinks=(os.name != 'nt')).create(venv_path)
 
 # Install dependencies using venv pip (NOT sys.executable)
 if os.name == 'nt':  # Windows
     pip_path = os.path.join(venv_path, "Scripts", "pip")
 else:  # Unix/Linux/Mac
     pip_path = os.path.join(venv_path, "bin", "pip")
+deps = ["flask"]  # every package the project needs, installed in one pip call
+pip_flags = ["--disable-pip-version-check", "--no-input", "-q"]
 try:
-    subprocess.run([pip_path, "install", "flask"], check=True)
+    subprocess.run([pip_path, "install", *pip_flags, *deps], check=True)
 except subprocess.CalledProcessError as e:
     print("pip install failed, retrying with --break-system-packages due to PEP 668...")
-    subprocess.run([pip_path, "install", "--break-system-packages", "flask"], check=True)
+    subprocess.run([pip_path, "install", *pip_flags, "--break-system-packages", *deps], check=True)
 
 # Create application file
 app_code = '''
@@ -288,7 +257,7 @@ if __name__ == '__main__':
 app_path = os.path.join(project_folder, "app.py")
 with open(app_path, "w") as f:
     f.write(app_code)
-print(f"Wrote app.py to: {{app_path}}")
+print(f"Wrote app.py to: {app_path}")
 if not os.path.exists(app_path):
     print("Error: app.py was not created!")
     sys.exit(1)
@@ -296,7 +265,55 @@ if not os.path.exists(app_path):
 # Do NOT run or execute app.py or any other files. Only write them to disk.
 ```
 
-{codebase_section}"""
+$codebase_section""")
+
+def execute_tasks_prompt(sorted_tasks, codebase=None, existing_project_folder=None):
+    # Separate selected and rejected tasks
+    selected_tasks = [t for t in sorted_tasks if t.get('selectionStatus') == 'selected']
+    rejected_tasks = [t for t in sorted_tasks if t.get('selectionStatus') == 'rejected']
+    
+    task_list = "\n".join(f"- ({t['phase']}) {t['task']}" for t in selected_tasks)
+    
+    # Add rejected tasks as comments
+    rejected_section = ""
+    if rejected_tasks:
+        rejected_list = "\n".join(f"# REJECTED: {t['task']}" for t in rejected_tasks)
+        rejected_section = f"""
+
+**REJECTED TASKS (DO NOT IMPLEMENT THESE):**
+{rejected_list}
+
+**CRITICAL: DO NOT IMPLEMENT REJECTED FEATURES**
+- The above rejected tasks must NOT be implemented
+- Do not add any code related to these rejected features
+- Even if a rejected feature seems "logical" or "necessary", do not include it
+- If a selected task depends on a rejected task, implement only the parts that don't require the rejected feature
+- If you cannot implement a selected task without a rejected dependency, skip that task and add a comment explaining why
+"""
+    
+    codebase_section = ""
+    if codebase:
+        codebase_section = "\n\nEXISTING FILES AND CONTENTS (DO NOT REMOVE ANY OF THIS LOGIC):\n"
+        for path, content in codebase.items():
+            codebase_section += f"\n--- {path} ---\n{content}\n"
+    
+    # Add existing project folder info if provided
+    existing_project_section = ""
+    if existing_project_folder:
+        existing_project_section = f"""
+**EXISTING PROJECT FOLDER:**
+- Use the existing project folder: {existing_project_folder}
+- Do NOT create a new project folder
+- Modify existing files in this folder instead of creating new ones
+- If the folder doesn't exist, create it
+"""
+    
+    return _EXECUTE_TASKS_TEMPLATE.substitute(
+        task_list=task_list,
+        existing_project_section=existing_project_section,
+        rejected_section=rejected_section,
+        codebase_section=codebase_section,
+    )
 
 def fetch_messages():
     with open("json/messages.json", "r") as f:
@@ -1,51 +1,214 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_file, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import json
 import os
 import uuid
 import subprocess
 import sys
+import tempfile
+import threading
+import copy
+import functools
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """JSON responses without debug-mode indentation or key sorting"""
+    compact = True
+    sort_keys = False
 
 app = Flask(__name__)
+app.json = CompactJSONProvider(app)
 CORS(app)
 
 # Path to the JSON data files (relative to the main Kettle directory)
 KETTLE_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'json')
 KETTLE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+# Create it once here rather than on every save
+os.makedirs(KETTLE_DATA_DIR, exist_ok=True)
+
+# Full paths of the data files the API touches on every request
+DATA_PATHS = {
+    name: os.path.join(KETTLE_DATA_DIR, name)
+    for name in ('phased_tasks.json', 'messages.json', 'media.json',
+                 'dependency_matrix.json', 'writing_tasks.json')
+}
+
+def data_path(filename: str) -> str:
+    """Full path of a file in the Kettle data directory"""
+    return DATA_PATHS.get(filename) or os.path.join(KETTLE_DATA_DIR, filename)
 
 # Path to the virtual environment Python interpreter
 VENV_PYTHON = os.path.join(KETTLE_ROOT, 'kettle_env', 'bin', 'python3')
 
-def load_json_file(filename: str) -> Dict[str, Any]:
-    """Load JSON file from the Kettle data directory"""
-    filepath = os.path.join(KETTLE_DATA_DIR, filename)
+# Where generated projects are written, and directories not worth scanning in them
+WORK_DIR = os.path.expanduser("~/Desktop/Work")
+WORK_SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', 'venv', '.venv', 'env', 'dist', 'build', '.pytest_cache'})
+
+# Background task executions by job id. One worker, since every run reads
+# and rewrites the same phased_tasks.json. Finished jobs are kept for
+# EXECUTION_JOB_TTL seconds so clients can still collect the result.
+EXECUTION_JOB_TTL = 600
+# Seconds execute_tasks.py may run. It waits up to its own SCRIPT_TIMEOUT (1800s)
+# for the bootstrap script, plus the Claude calls before it, so allow more.
+EXECUTION_TIMEOUT = 2400
+_execution_executor = ThreadPoolExecutor(max_workers=1)
+_execution_jobs: Dict[str, Future] = {}
+_execution_finished_at: Dict[str, float] = {}
+# Ids of the tasks each job was submitted with
+_execution_job_tasks: Dict[str, frozenset] = {}
+_execution_jobs_lock = threading.Lock()
+
+def _prune_execution_jobs() -> None:
+    """Forget finished jobs older than EXECUTION_JOB_TTL; call with _execution_jobs_lock held"""
+    cutoff = time.time() - EXECUTION_JOB_TTL
+    for job_id, finished_at in list(_execution_finished_at.items()):
+        if finished_at < cutoff:
+            del _execution_finished_at[job_id]
+            _execution_jobs.pop(job_id, None)
+            _execution_job_tasks.pop(job_id, None)
+
+def _record_job_finished(job_id: str) -> None:
+    with _execution_jobs_lock:
+        _execution_finished_at[job_id] = time.time()
+
+# Parsed JSON per file path as (mtime_ns, size, data), reused until the file's stamp
+# changes. Read-only handlers share the cached object; handlers that mutate it ask for a copy.
+_json_cache: Dict[str, Tuple[int, int, Any]] = {}
+_json_cache_lock = threading.Lock()
+
+def _file_stamp(filepath: str) -> Tuple[int, int]:
+    """(mtime_ns, size) of a file; size catches rewrites within the same mtime tick"""
+    st = os.stat(filepath)
+    return st.st_mtime_ns, st.st_size
+
+def load_json_file(filename: str, mutable: bool = False) -> Dict[str, Any]:
+    """Load JSON file from the Kettle data directory (a private copy if mutable)"""
+    filepath = data_path(filename)
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        stamp = _file_stamp(filepath)
+        with _json_cache_lock:
+            cached = _json_cache.get(filepath)
+        if cached is not None and cached[:2] == stamp:
+            return copy.deepcopy(cached[2]) if mutable else cached[2]
+        # json.loads takes the raw bytes, skipping the text-mode decode layer
+        with open(filepath, 'rb') as f:
+            data = json.loads(f.read())
     except FileNotFoundError:
         return {}
     except json.JSONDecodeError:
         return {}
+    with _json_cache_lock:
+        _json_cache[filepath] = (*stamp, data)
+    return copy.deepcopy(data) if mutable else data
+
+def save_json_file(filename: str, data: Dict[str, Any], pretty: bool = False) -> None:
+    """Save JSON file to the Kettle data directory (indented only if pretty)"""
+    filepath = data_path(filename)
+    # Encode once and hand the file a single write; json.dump would push
+    # every iterencode chunk through the text layer separately
+    if pretty:
+        payload = json.dumps(data, indent=2).encode('utf-8')
+    else:
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    # Write a sibling temp file and swap it in, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), prefix='.' + filename, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        # mkstemp creates the file 0600; keep the permissions a plain open() would give
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    # What we just wrote is what the next load would parse
+    stamp = _file_stamp(filepath)
+    with _json_cache_lock:
+        _json_cache[filepath] = (*stamp, data)
+
+@functools.lru_cache(maxsize=4096)
+def _task_uuid(task: str, source: str) -> str:
+    """uuid5 of a task's text and source, memoized since it hashes with SHA-1"""
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{task}{source}"))
+
+# Response bodies of read-only endpoints as (file stamps, body), reused while
+# none of the files the endpoint reads has changed
+_response_cache: Dict[str, Tuple[Tuple, bytes]] = {}
+
+def _data_files_stamp(filenames: Tuple[str, ...]) -> Tuple:
+    """Stamps of several data files, with None for any that is missing"""
+    stamps = []
+    for filename in filenames:
+        try:
+            stamps.append(_file_stamp(data_path(filename)))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+def cached_on_files(*filenames: str):
+    """Cache a GET view's successful JSON response until one of its data files changes"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.path  # these views ignore query args; keep them out of the key
+            # Stamp before building, so a write during the build only costs a rebuild
+            stamp = _data_files_stamp(filenames)
+            with _json_cache_lock:
+                cached = _response_cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                return app.response_class(cached[1], mimetype='application/json')
+            rv = view(*args, **kwargs)
+            if isinstance(rv, Response) and rv.status_code == 200:
+                with _json_cache_lock:
+                    _response_cache[key] = (stamp, rv.get_data())
+            return rv
+        return wrapper
+    return decorator
+
+def task_id_for(task: Dict[str, Any]) -> str:
+    """Return a task's id, generating a consistent one from its content if missing"""
+    # Never writes to the task: read-only handlers pass in the shared cached object
+    return task.get('id') or _task_uuid(task.get('task', ''), task.get('source', ''))
 
-def save_json_file(filename: str, data: Dict[str, Any]) -> None:
-    """Save JSON file to the Kettle data directory"""
-    filepath = os.path.join(KETTLE_DATA_DIR, filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+def index_tasks(tasks_data: List[Dict[str, Any]], category: str = None) -> Dict[str, Dict[str, Any]]:
+    """Map task id -> task (first one wins), optionally only for one category"""
+    index = {}
+    for task in tasks_data:
+        if category is None or task.get('category', 'coding') == category:
+            index.setdefault(task_id_for(task), task)
+    return index
+
+# Reverse of dependency_matrix.json's task -> prerequisites map, rebuilt when the file changes
+_dependents_cache: Dict[str, Any] = {'stamp': None, 'dependents': {}}
+
+def load_dependency_matrix() -> Tuple[Dict[str, List[str]], Dict[str, str], Dict[str, List[str]]]:
+    """Return the matrix's dependencies, explanations, and task id -> ids of tasks depending on it"""
+    # Stamp before loading, so a write in between only costs a rebuild next time
+    stamp = _data_files_stamp(('dependency_matrix.json',))
+    dependency_matrix = load_json_file('dependency_matrix.json')
+    dependencies_data = dependency_matrix.get('dependencies', {})
+    explanations_data = dependency_matrix.get('explanations', {})
+    with _json_cache_lock:
+        if _dependents_cache['stamp'] == stamp:
+            return dependencies_data, explanations_data, _dependents_cache['dependents']
+    dependents = {}
+    for task_id, prerequisites in dependencies_data.items():
+        for prerequisite in dict.fromkeys(prerequisites):
+            dependents.setdefault(prerequisite, []).append(task_id)
+    with _json_cache_lock:
+        _dependents_cache['stamp'] = stamp
+        _dependents_cache['dependents'] = dependents
+    return dependencies_data, explanations_data, dependents
 
 def transform_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
     """Transform task data to include required fields for the frontend"""
-    # Generate a consistent ID based on task content if not present
-    if 'id' not in task_data:
-        task_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{task_data.get('task', '')}{task_data.get('source', '')}"))
-    else:
-        task_id = task_data['id']
-    
     return {
-        'id': task_id,
+        'id': task_id_for(task_data),
         'task': task_data.get('task', ''),
         'source': task_data.get('source', ''),
         'phase': task_data.get('phase', 'feature_implementation'),
@@ -62,6 +225,15 @@ def all_coding_tasks_executed(tasks_data):
     coding_tasks = [task for task in tasks_data if task.get('category', 'coding') == 'coding']
     return all(task.get('selectionStatus') == 'executed' for task in coding_tasks) if coding_tasks else False
 
+def _stream_tasks(tasks):
+    """Yield a JSON array of already-transformed tasks one element at a time"""
+    yield '['
+    for i, task in enumerate(tasks):
+        if i:
+            yield ','
+        yield app.json.dumps(task, separators=(',', ':'))
+    yield ']'
+
 @app.route('/api/tasks', methods=['GET'])
 def get_tasks():
     """Get coding tasks first; only return research tasks if all coding tasks are executed."""
@@ -75,7 +247,9 @@ def get_tasks():
         else:
             # Return only research tasks
             tasks = [transform_task(task) for task in tasks_data if task.get('category') == 'research']
-        return jsonify(tasks)
+        # Transform inside the try so a bad task still gets the 500 below; only the
+        # encoding is streamed, so the whole body is never held in memory
+        return Response(stream_with_context(_stream_tasks(tasks)), mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -86,32 +260,20 @@ def select_task(task_id: str):
         data = request.get_json()
         status = data.get('status', 'pending')  # 'selected', 'rejected', or 'pending'
         
-        # Load current tasks
-        tasks_data = load_json_file('phased_tasks.json')
+        # Load current tasks (a copy, so readers never see a half-applied update)
+        tasks_data = load_json_file('phased_tasks.json', mutable=True)
         
         if isinstance(tasks_data, list):
             # Find and update the task (only coding tasks)
-            task_found = False
-            for task in tasks_data:
-                # Only process coding tasks
-                task_category = task.get('category', 'coding')
-                if task_category != 'coding':
-                    continue
-                    
-                # Check if this task matches the ID (either by existing ID or by generating one)
-                task_check_id = task.get('id') or str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{task.get('task', '')}{task.get('source', '')}"))
-                
-                if task_check_id == task_id:
-                    task['id'] = task_id  # Ensure ID is set
-                    task['selectionStatus'] = status
-                    if status in ['selected', 'rejected']:
-                        task['selectedAt'] = datetime.now().isoformat()
-                    task_found = True
-                    break
-            
-            if not task_found:
+            task = index_tasks(tasks_data, category='coding').get(task_id)
+            if task is None:
                 return jsonify({'error': 'Coding task not found'}), 404
             
+            task['id'] = task_id  # Ensure ID is set (this is our private copy)
+            task['selectionStatus'] = status
+            if status in ['selected', 'rejected']:
+                task['selectedAt'] = datetime.now().isoformat()
+            
             # Save updated tasks
             save_json_file('phased_tasks.json', tasks_data)
         
@@ -130,43 +292,29 @@ def get_task_dependencies(task_id: str):
             return jsonify({'error': 'No tasks found'}), 404
         
         # Find the target task
-        target_task = None
-        for task in tasks_data:
-            task_check_id = task.get('id') or str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{task.get('task', '')}{task.get('source', '')}"))
-            if task_check_id == task_id:
-                target_task = task
-                break
+        tasks_by_id = index_tasks(tasks_data)
+        target_task = tasks_by_id.get(task_id)
         
         if not target_task:
             return jsonify({'error': 'Task not found'}), 404
         
-        # Load dependency matrix
-        try:
-            dependency_matrix = load_json_file('dependency_matrix.json')
-            dependencies_data = dependency_matrix.get('dependencies', {})
-            explanations_data = dependency_matrix.get('explanations', {})
-        except (FileNotFoundError, json.JSONDecodeError):
-            # Fallback to empty dependencies if matrix doesn't exist
-            dependencies_data = {}
-            explanations_data = {}
+        # Load dependency matrix (empty if it doesn't exist yet)
+        dependencies_data, explanations_data, dependents = load_dependency_matrix()
         
-        # Find tasks that depend on the target task
+        # Find tasks that depend on the target task via the reverse index
         dependencies = []
-        target_task_id = target_task.get('id')
+        target_task_id = task_id_for(target_task)
         
-        for task in tasks_data:
-            task_id = task.get('id')
-            if task_id and task_id != target_task_id:
-                # Check if this task depends on the target task
-                task_dependencies = dependencies_data.get(task_id, [])
-                if target_task_id in task_dependencies:
-                    dependencies.append({
-                        'id': task_id,
-                        'task': task.get('task'),
-                        'phase': task.get('phase'),
-                        'selectionStatus': task.get('selectionStatus', 'pending'),
-                        'reason': explanations_data.get(task_id, f'Depends on {target_task.get("task", "")}')
-                    })
+        for task_id in dependents.get(target_task_id, []):
+            task = tasks_by_id.get(task_id)
+            if task is not None and task_id != target_task_id:
+                dependencies.append({
+                    'id': task_id,
+                    'task': task.get('task'),
+                    'phase': task.get('phase'),
+                    'selectionStatus': task.get('selectionStatus', 'pending'),
+                    'reason': explanations_data.get(task_id, f'Depends on {target_task.get("task", "")}')
+                })
         
         return jsonify({
             'task': target_task,
@@ -177,9 +325,87 @@ def get_task_dependencies(task_id: str):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def files_modified_since(folder: str, since: float) -> bool:
+    """True if any file under folder (outside WORK_SKIP_DIRS) was modified after since"""
+    for root, dirs, files in os.walk(folder):
+        # Prune dependency and build trees; they hold most files and none the script writes
+        dirs[:] = [d for d in dirs if d not in WORK_SKIP_DIRS]
+        for file in files:
+            try:
+                if os.path.getmtime(os.path.join(root, file)) > since:
+                    return True
+            except OSError:
+                continue
+    return False
+
+def _run_selected_tasks(task_ids: List[str], tasks_json: str) -> Tuple[Dict[str, Any], int]:
+    """Run execute_tasks.py for the selected tasks; returns the response body and status code"""
+    try:
+        # Execute the selected tasks using the virtual environment's Python interpreter,
+        # from the Kettle root (cwd= leaves this server's own working directory alone),
+        # handing it the tasks on stdin
+        started_at = time.time()
+        result = subprocess.run([
+            VENV_PYTHON, 'tools/execute_tasks.py', '--stdin'
+        ], cwd=KETTLE_ROOT, input=tasks_json, capture_output=True, text=True, timeout=EXECUTION_TIMEOUT)
+        
+        # Check if files were actually created (success indicator)
+        files_created = files_modified_since(WORK_DIR, started_at)
+        
+        # Consider it successful if files were created, even if return code is non-zero
+        if result.returncode == 0 or files_created:
+            # Mark the tasks that were selected as executed; reload first, since
+            # the file may have been edited while the run was in progress
+            tasks_data = load_json_file('phased_tasks.json', mutable=True)
+            if isinstance(tasks_data, list):
+                tasks_by_id = index_tasks(tasks_data, category='coding')
+                executed_at = datetime.now().isoformat()
+                for task_id in task_ids:
+                    task = tasks_by_id.get(task_id)
+                    if task is not None:
+                        task['selectionStatus'] = 'executed'
+                        task['executedAt'] = executed_at
+                
+                # Save updated tasks
+                save_json_file('phased_tasks.json', tasks_data)
+            
+            success_message = f'Successfully executed {len(task_ids)} selected coding tasks'
+            if files_created and result.returncode != 0:
+                success_message += ' (files created despite script warnings)'
+            
+            return {
+                'success': True,
+                'message': success_message,
+                'output': result.stdout,
+                'stderr': result.stderr,
+                'returnCode': result.returncode,
+                'filesCreated': files_created,
+                'executedTasks': len(task_ids)
+            }, 200
+        else:
+            return {
+                'success': False,
+                'error': 'Task execution failed',
+                'output': result.stdout,
+                'stderr': result.stderr,
+                'returnCode': result.returncode,
+                'filesCreated': files_created
+            }, 500
+    
+    except subprocess.TimeoutExpired:
+        return {
+            'success': False,
+            'error': f'Task execution timed out ({EXECUTION_TIMEOUT // 60} minutes)'
+        }, 500
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }, 500
+
 @app.route('/api/execute-selected', methods=['POST'])
 def execute_selected_tasks():
-    """Execute all selected coding tasks in batch"""
+    """Start executing all selected coding tasks in the background"""
     try:
         # Load current tasks
         tasks_data = load_json_file('phased_tasks.json')
@@ -195,114 +421,92 @@ def execute_selected_tasks():
         if not selected_tasks:
             return jsonify({'error': 'No coding tasks selected for execution'}), 400
         
-        # Create a temporary file with only selected tasks for execution
-        temp_tasks_file = os.path.join(KETTLE_DATA_DIR, 'temp_selected_tasks.json')
-        with open(temp_tasks_file, 'w') as f:
-            json.dump(selected_tasks, f, indent=2)
+        # Rejected tasks go along too, so the prompt can tell the model what not to build
+        rejected_tasks = [task for task in tasks_data
+                          if task.get('selectionStatus') == 'rejected'
+                          and task.get('category', 'coding') == 'coding']
         
-        try:
-            # Change to Kettle root directory
-            os.chdir(KETTLE_ROOT)
-            
-            # Execute the selected tasks using the virtual environment's Python interpreter
-            result = subprocess.run([
-                VENV_PYTHON, 'tools/execute_tasks.py'
-            ], capture_output=True, text=True, timeout=300)  # 5 minute timeout
-            
-            # Check if files were actually created (success indicator)
-            work_dir = os.path.expanduser("~/Desktop/Work")
-            files_created = False
-            if os.path.exists(work_dir):
-                # Check if any new files were created in the last few minutes
-                import time
-                current_time = time.time()
-                for root, dirs, files in os.walk(work_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if os.path.getmtime(file_path) > current_time - 300:  # Files created in last 5 minutes
-                            files_created = True
-                            break
-                    if files_created:
-                        break
-            
-            # Consider it successful if files were created, even if return code is non-zero
-            if result.returncode == 0 or files_created:
-                # Mark selected coding tasks as executed
-                for task in tasks_data:
-                    if (task.get('selectionStatus') == 'selected' and 
-                        task.get('category', 'coding') == 'coding'):
-                        task['selectionStatus'] = 'executed'
-                        task['executedAt'] = datetime.now().isoformat()
-                
-                # Save updated tasks
-                save_json_file('phased_tasks.json', tasks_data)
-                
-                success_message = f'Successfully executed {len(selected_tasks)} selected coding tasks'
-                if files_created and result.returncode != 0:
-                    success_message += ' (files created despite script warnings)'
-                
-                return jsonify({
-                    'success': True,
-                    'message': success_message,
-                    'output': result.stdout,
-                    'stderr': result.stderr,
-                    'returnCode': result.returncode,
-                    'filesCreated': files_created,
-                    'executedTasks': len(selected_tasks)
-                })
-            else:
+        # Encode the tasks now, while they match the file, for the script's stdin
+        tasks_json = json.dumps(selected_tasks + rejected_tasks)
+        
+        # The run takes minutes, so hand it to the executor and let the client poll.
+        # Only one run at a time: a repeat request for exactly the same tasks gets the
+        # running job back; a different selection is refused until that run is done,
+        # since queuing it would re-run the tasks still marked selected by the first.
+        task_ids = [task_id_for(task) for task in selected_tasks]
+        task_set = frozenset(task_ids)
+        with _execution_jobs_lock:
+            _prune_execution_jobs()
+            for running_id, job in _execution_jobs.items():
+                if job.done():
+                    continue
+                if _execution_job_tasks.get(running_id) == task_set:
+                    return jsonify({'success': True, 'jobId': running_id, 'status': 'running'}), 202
                 return jsonify({
                     'success': False,
-                    'error': 'Task execution failed',
-                    'output': result.stdout,
-                    'stderr': result.stderr,
-                    'returnCode': result.returncode,
-                    'filesCreated': files_created
-                }), 500
-                
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_tasks_file):
-                os.remove(temp_tasks_file)
+                    'jobId': running_id,
+                    'error': 'Another execution is still running; try again once it finishes'
+                }), 409
+            job_id = str(uuid.uuid4())
+            job = _execution_executor.submit(_run_selected_tasks, task_ids, tasks_json)
+            _execution_jobs[job_id] = job
+            _execution_job_tasks[job_id] = task_set
+        job.add_done_callback(lambda _: _record_job_finished(job_id))
+        
+        return jsonify({'success': True, 'jobId': job_id, 'status': 'running'}), 202
                 
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'success': False,
-            'error': 'Task execution timed out (5 minutes)'
-        }), 500
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/execute-status/<job_id>', methods=['GET'])
+def get_execution_status(job_id: str):
+    """Report whether a background execution has finished, and its result if so"""
+    with _execution_jobs_lock:
+        _prune_execution_jobs()
+        job = _execution_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Execution job not found'}), 404
+    if not job.done():
+        return jsonify({'success': True, 'jobId': job_id, 'status': 'running'})
+    body, status_code = job.result()
+    return jsonify({**body, 'jobId': job_id, 'status': 'done'}), status_code
+
 @app.route('/api/messages', methods=['GET'])
 def get_messages():
     """Get all messages from messages.json"""
     try:
-        messages_data = load_json_file('messages.json')
-        return jsonify(messages_data)
+        filepath = data_path('messages.json')
+        if not os.path.isfile(filepath):
+            return jsonify({})
+        # The file already is the response body, so send it without a parse and
+        # re-encode; the ETag lets repeat polls come back as 304 Not Modified
+        return send_file(filepath, mimetype='application/json', conditional=True, etag=True)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/stats', methods=['GET'])
+@cached_on_files('phased_tasks.json', 'messages.json')
 def get_stats():
     """Get dashboard statistics for coding tasks"""
     try:
         tasks_data = load_json_file('phased_tasks.json')
         messages_data = load_json_file('messages.json')
         
-        # Filter to only coding tasks
+        # Count coding tasks by selection status in a single pass
         all_tasks = tasks_data if isinstance(tasks_data, list) else []
-        coding_tasks = [task for task in all_tasks if task.get('category', 'coding') == 'coding']
+        status_counts = Counter(task.get('selectionStatus') for task in all_tasks
+                                if task.get('category', 'coding') == 'coding')
         
         messages = messages_data.get('messages', []) if isinstance(messages_data, dict) else []
         
         stats = {
-            'totalTasks': len(coding_tasks),
-            'selectedTasks': len([t for t in coding_tasks if t.get('selectionStatus') == 'selected']),
-            'pendingSelection': len([t for t in coding_tasks if t.get('selectionStatus') == 'pending']),
-            'executedTasks': len([t for t in coding_tasks if t.get('selectionStatus') == 'executed']),
+            'totalTasks': sum(status_counts.values()),
+            'selectedTasks': status_counts['selected'],
+            'pendingSelection': status_counts['pending'],
+            'executedTasks': status_counts['executed'],
             'totalMessages': len(messages)
         }
         
@@ -354,6 +558,7 @@ def reset_media():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/research-resources', methods=['GET'])
+@cached_on_files('phased_tasks.json', 'media.json')
 def get_research_resources():
     """Get all research resources from media.json, but only if all coding tasks are executed."""
     try:
@@ -364,9 +569,10 @@ def get_research_resources():
         resources = []
         if isinstance(media_data, dict) and 'research_topics' in media_data:
             for topic in media_data['research_topics'].values():
-                for resource in topic.get('media_links', []):
-                    resource['research_task'] = topic.get('research_task', '')
-                    resources.append(resource)
+                research_task = topic.get('research_task', '')
+                # Copies: media_data is the cached object and must stay as on disk
+                resources.extend({**resource, 'research_task': research_task}
+                                 for resource in topic.get('media_links', []))
         return jsonify(resources)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -378,6 +584,7 @@ def serve_writing_file(filename):
     return send_from_directory(writing_dir, filename, as_attachment=False)
 
 @app.route('/api/writing_tasks', methods=['GET'])
+@cached_on_files('writing_tasks.json')
 def get_writing_tasks():
     """Return all writing tasks, including report_path."""
     try:
@@ -0,0 +1,6 @@
+"""WSGI entry point for serving the Kettle API with gunicorn"""
+from app import app
+
+# Run from web_app/api. Use a single worker with threads: execution jobs live in
+# that process's memory, so status polls must reach the worker that started them.
+#   gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5001 wsgi:app
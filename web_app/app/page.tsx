@@ -153,7 +153,14 @@ export default function Dashboard() {
         headers: { 'Content-Type': 'application/json' }
       })
       
-      const result = await response.json()
+      let result = await response.json()
+      
+      // Execution runs in the background; poll until the job finishes
+      while (result.success && result.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 2000))
+        const statusResponse = await fetch(`/api/execute-status/${result.jobId}`)
+        result = await statusResponse.json()
+      }
       
       if (result.success) {
         alert(`Successfully executed ${result.executedTasks} tasks!`)